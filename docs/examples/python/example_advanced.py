@@ -6,9 +6,30 @@ Demonstrates advanced features: clustering, HA, backups, monitoring, and more.
 """
 
 from horcrux_client import HorcruxClient, HorcruxError
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import sys
-import time
+
+_ONE_HOUR = timedelta(hours=1)
+_INV_MB = 1.0 / (1024 * 1024)
+_INV_HOUR = 1.0 / 3600.0
+
+
+def metric_points(history):
+    """Return the points of a metric history, whether wrapped in {'data': ...} or not"""
+    return history.get('data') if isinstance(history, dict) else history
+
+
+def latest_value(history):
+    """Return the most recent value of a metric history, or None"""
+    points = metric_points(history)
+    return points[-1]['value'] if points else None
+
+
+def print_lines(lines):
+    """Print an iterable of lines with a single write"""
+    text = "\n".join(lines)
+    if text:
+        print(text)
 
 
 def example_backup_and_restore(client: HorcruxClient, vm_id: str):
@@ -31,7 +52,12 @@ def example_backup_and_restore(client: HorcruxClient, vm_id: str):
     # Wait for backup to complete
     print("   Waiting for backup to complete...")
     try:
-        completed_backup = client.wait_for_backup(backup_id, timeout=600)
+        completed_backup = client.wait_for_backup(
+            backup_id,
+            timeout=600,
+            progress_callback=lambda event: print(
+                f"   ... {event.get('progress', 0)}%")
+        )
         print(f"   ✓ Backup completed: {completed_backup['size']} bytes")
     except HorcruxError as e:
         print(f"   ✗ Backup failed: {e.message}")
@@ -40,8 +66,7 @@ def example_backup_and_restore(client: HorcruxClient, vm_id: str):
     # List all backups
     print("\n2. Listing all backups for VM...")
     backups = client.list_backups(vm_id=vm_id)
-    for b in backups:
-        print(f"   - {b['id']}: {b['type']}, {b['status']}")
+    print_lines(f"   - {b['id']}: {b['type']}, {b['status']}" for b in backups)
 
     # Restore backup (to a new VM)
     print("\n3. Restoring backup to new VM...")
@@ -70,16 +95,21 @@ def example_high_availability(client: HorcruxClient, vm_id: str):
     )
     print("   ✓ VM added to HA management")
 
+    # Fetch HA resources and status concurrently
+    with client.batch() as batch:
+        pending_resources = batch.list_ha_resources()
+        pending_status = batch.get_ha_status()
+
     # List HA resources
     print("\n2. Listing HA resources...")
-    ha_resources = client.list_ha_resources()
-    for resource in ha_resources:
-        print(f"   - VM {resource['vm_id']}: priority={resource['priority']}, "
-              f"state={resource['state']}")
+    ha_resources = pending_resources.result()
+    print_lines(f"   - VM {resource['vm_id']}: priority={resource['priority']}, "
+                f"state={resource['state']}"
+                for resource in ha_resources)
 
     # Get HA status
     print("\n3. Getting HA status...")
-    ha_status = client.get_ha_status()
+    ha_status = pending_status.result()
     print(f"   Enabled: {ha_status['enabled']}")
     print(f"   Total resources: {ha_status['total_resources']}")
     print(f"   Running: {ha_status['resources_started']}")
@@ -96,21 +126,26 @@ def example_cluster_operations(client: HorcruxClient):
     print("Cluster Management Example")
     print("=" * 60)
 
+    # Fetch nodes and architecture summary concurrently
+    with client.batch() as batch:
+        pending_nodes = batch.list_cluster_nodes()
+        pending_arch = batch.get_cluster_architecture()
+
     # List cluster nodes
     print("\n1. Listing cluster nodes...")
-    nodes = client.list_cluster_nodes()
+    nodes = pending_nodes.result()
     print(f"   Found {len(nodes)} node(s):")
-    for node in nodes:
-        print(f"   - {node['name']}: {node['architecture']}, "
-              f"status={node['status']}, VMs={node.get('vms_running', 0)}")
+    print_lines(f"   - {node['name']}: {node['architecture']}, "
+                f"status={node['status']}, VMs={node.get('vms_running', 0)}"
+                for node in nodes)
 
     # Get cluster architecture
     print("\n2. Getting cluster architecture...")
-    arch = client.get_cluster_architecture()
+    arch = pending_arch.result()
     print(f"   Total nodes: {arch['total_nodes']}")
     print("   Architectures:")
-    for arch_name, count in arch['architectures'].items():
-        print(f"   - {arch_name}: {count} node(s)")
+    print_lines(f"   - {arch_name}: {count} node(s)"
+                for arch_name, count in arch['architectures'].items())
 
 
 def example_monitoring_and_alerts(client: HorcruxClient, vm_id: str):
@@ -119,41 +154,53 @@ def example_monitoring_and_alerts(client: HorcruxClient, vm_id: str):
     print("Monitoring & Alerting Example")
     print("=" * 60)
 
+    # Fetch node stats and all VM metric series concurrently; the VM
+    # series come back from a single multi-metric query
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - _ONE_HOUR
+
+    with client.batch() as batch:
+        pending_node_stats = batch.get_node_stats()
+        pending_vm_metrics = batch.get_metrics_history(
+            metrics=["cpu_usage", "memory_usage",
+                     "network_rx_bytes", "network_tx_bytes"],
+            targets=[("vm", vm_id)],
+            start=start_time,
+            end=end_time,
+            interval=300  # 5 minutes
+        )
+    vm_metrics = pending_vm_metrics.result()[f"vm:{vm_id}"]
+
     # Get node statistics
     print("\n1. Getting node statistics...")
-    node_stats = client.get_node_stats()
+    node_stats = pending_node_stats.result()
     print(f"   CPU Usage: {node_stats['cpu_usage']}%")
-    print(f"   Memory: {node_stats['memory_used']/node_stats['memory_total']*100:.1f}%")
-    print(f"   Uptime: {node_stats['uptime_seconds']/3600:.1f} hours")
+    print(f"   Memory: {100.0 * node_stats['memory_used'] / node_stats['memory_total']:.1f}%")
+    print(f"   Uptime: {node_stats['uptime_seconds'] * _INV_HOUR:.1f} hours")
 
-    # Get VM statistics
+    # Derive current VM statistics from the latest point of each series
     print("\n2. Getting VM statistics...")
-    vm_stats = client.get_vm_stats(vm_id)
+    vm_stats = {}
+    for metric, series in vm_metrics.items():
+        value = latest_value(series)
+        if value is not None:
+            vm_stats[metric] = value
     print(f"   CPU Usage: {vm_stats.get('cpu_usage', 'N/A')}%")
     print(f"   Memory Usage: {vm_stats.get('memory_usage', 'N/A')}%")
-    print(f"   Network RX: {vm_stats.get('network_rx_bytes', 0)/1024/1024:.2f} MB")
-    print(f"   Network TX: {vm_stats.get('network_tx_bytes', 0)/1024/1024:.2f} MB")
+    print(f"   Network RX: {vm_stats.get('network_rx_bytes', 0) * _INV_MB:.2f} MB")
+    print(f"   Network TX: {vm_stats.get('network_tx_bytes', 0) * _INV_MB:.2f} MB")
 
     # Get metric history
     print("\n3. Getting CPU usage history (last hour)...")
-    end_time = datetime.now()
-    start_time = end_time - timedelta(hours=1)
-
-    history = client.get_metric_history(
-        metric="cpu_usage",
-        start=start_time,
-        end=end_time,
-        interval=300  # 5 minutes
-    )
+    points = metric_points(vm_metrics["cpu_usage"])
 
-    if history.get('data'):
-        print(f"   Retrieved {len(history['data'])} data points")
+    if points:
+        print(f"   Retrieved {len(points)} data points")
         # Show first and last
-        if len(history['data']) > 0:
-            first = history['data'][0]
-            last = history['data'][-1]
-            print(f"   First: {first['timestamp']} = {first['value']}%")
-            print(f"   Last: {last['timestamp']} = {last['value']}%")
+        first = points[0]
+        last = points[-1]
+        print(f"   First: {first['timestamp']} = {first['value']}%")
+        print(f"   Last: {last['timestamp']} = {last['value']}%")
 
     # Create an alert rule
     print("\n4. Creating alert rule...")
@@ -168,19 +215,23 @@ def example_monitoring_and_alerts(client: HorcruxClient, vm_id: str):
     )
     print(f"   ✓ Created alert rule: {alert_rule['id']}")
 
-    # List alert rules
+    # List alert rules and active alerts concurrently
+    with client.batch() as batch:
+        pending_rules = batch.list_alert_rules()
+        pending_active_alerts = batch.list_active_alerts()
+
     print("\n5. Listing alert rules...")
-    rules = client.list_alert_rules()
-    for rule in rules:
-        print(f"   - {rule['name']}: {rule['condition']} {rule['threshold']}")
+    rules = pending_rules.result()
+    print_lines(f"   - {rule['name']}: {rule['condition']} {rule['threshold']}"
+                for rule in rules)
 
     # List active alerts
     print("\n6. Checking active alerts...")
-    active_alerts = client.list_active_alerts()
+    active_alerts = pending_active_alerts.result()
     if active_alerts:
         print(f"   Found {len(active_alerts)} active alert(s)")
-        for alert in active_alerts:
-            print(f"   - {alert['rule_name']}: {alert['severity']}")
+        print_lines(f"   - {alert['rule_name']}: {alert['severity']}"
+                    for alert in active_alerts)
     else:
         print("   No active alerts")
 
@@ -191,24 +242,34 @@ def example_snapshots_and_clones(client: HorcruxClient, vm_id: str):
     print("Snapshots & Cloning Example")
     print("=" * 60)
 
-    # Create multiple snapshots
+    # Create multiple snapshots in one batch
     print("\n1. Creating multiple snapshots...")
-    snapshots = []
-    for i in range(3):
-        snapshot = client.create_snapshot(
-            vm_id=vm_id,
-            name=f"snapshot-{i+1}",
-            description=f"Test snapshot {i+1}"
-        )
-        snapshots.append(snapshot)
-        print(f"   ✓ Created snapshot {i+1}")
-        time.sleep(1)  # Small delay between snapshots
+    with client.batch() as batch:
+        pending = [
+            batch.create_snapshot(
+                vm_id=vm_id,
+                name=f"snapshot-{i+1}",
+                description=f"Test snapshot {i+1}"
+            )
+            for i in range(3)
+        ]
+    snapshots = [p.result() for p in pending]
+    print(f"   ✓ Created {len(snapshots)} snapshots")
 
     # List all snapshots
     print("\n2. Listing all snapshots...")
     all_snapshots = client.list_snapshots(vm_id)
     print(f"   Total: {len(all_snapshots)} snapshots")
 
+    # Snapshots are created without any client-side delay, so confirm the
+    # server recorded every one of them
+    listed_ids = {snap['id'] for snap in all_snapshots}
+    missing = [snap['name'] for snap in snapshots if snap['id'] not in listed_ids]
+    if missing:
+        print(f"   ✗ Missing snapshots: {', '.join(missing)}")
+    else:
+        print(f"   ✓ All {len(snapshots)} new snapshots present")
+
     # Clone VM (full clone)
     print("\n3. Creating full clone...")
     clone = client.clone_vm(
@@ -231,8 +292,9 @@ def example_snapshots_and_clones(client: HorcruxClient, vm_id: str):
     # Cleanup
     print("\n5. Cleaning up...")
     print("   Deleting snapshots...")
-    for snap in snapshots:
-        client.delete_snapshot(vm_id, snap['id'])
+    with client.batch() as batch:
+        for snap in snapshots:
+            batch.delete_snapshot(vm_id, snap['id'])
     print("   ✓ Deleted snapshots")
 
     print("   Deleting clone...")
@@ -246,48 +308,43 @@ def example_firewall(client: HorcruxClient):
     print("Firewall Management Example")
     print("=" * 60)
 
-    # Add firewall rules
+    # Add firewall rules in one batch
     print("\n1. Adding firewall rules...")
-
-    # SSH rule
-    ssh_rule = client.add_firewall_rule(
-        name="allow-ssh",
-        action="Accept",
-        protocol="Tcp",
-        port=22,
-        source="0.0.0.0/0",
-        enabled=True
-    )
-    print(f"   ✓ Added SSH rule: {ssh_rule['id']}")
-
-    # HTTP rule
-    http_rule = client.add_firewall_rule(
-        name="allow-http",
-        action="Accept",
-        protocol="Tcp",
-        port=80,
-        source="0.0.0.0/0",
-        enabled=True
-    )
-    print(f"   ✓ Added HTTP rule: {http_rule['id']}")
-
-    # HTTPS rule
-    https_rule = client.add_firewall_rule(
-        name="allow-https",
-        action="Accept",
-        protocol="Tcp",
-        port=443,
-        source="0.0.0.0/0",
-        enabled=True
-    )
-    print(f"   ✓ Added HTTPS rule: {https_rule['id']}")
+    with client.batch() as batch:
+        ssh_rule = batch.add_firewall_rule(
+            name="allow-ssh",
+            action="Accept",
+            protocol="Tcp",
+            port=22,
+            source="0.0.0.0/0",
+            enabled=True
+        )
+        http_rule = batch.add_firewall_rule(
+            name="allow-http",
+            action="Accept",
+            protocol="Tcp",
+            port=80,
+            source="0.0.0.0/0",
+            enabled=True
+        )
+        https_rule = batch.add_firewall_rule(
+            name="allow-https",
+            action="Accept",
+            protocol="Tcp",
+            port=443,
+            source="0.0.0.0/0",
+            enabled=True
+        )
+    print(f"   ✓ Added SSH rule: {ssh_rule.result()['id']}")
+    print(f"   ✓ Added HTTP rule: {http_rule.result()['id']}")
+    print(f"   ✓ Added HTTPS rule: {https_rule.result()['id']}")
 
     # List all rules
     print("\n2. Listing firewall rules...")
     rules = client.list_firewall_rules()
-    for rule in rules:
-        print(f"   - {rule['name']}: {rule['action']} {rule['protocol']} "
-              f"port {rule.get('port', 'any')}")
+    print_lines(f"   - {rule['name']}: {rule['action']} {rule['protocol']} "
+                f"port {rule.get('port', 'any')}"
+                for rule in rules)
 
     # Apply rules
     print("\n3. Applying firewall rules...")
@@ -296,71 +353,63 @@ def example_firewall(client: HorcruxClient):
 
     # Cleanup (delete rules we created)
     print("\n4. Cleaning up firewall rules...")
-    for rule_id in [ssh_rule['id'], http_rule['id'], https_rule['id']]:
-        client.delete_firewall_rule(rule_id)
+    with client.batch() as batch:
+        for rule in (ssh_rule, http_rule, https_rule):
+            batch.delete_firewall_rule(rule.result()['id'])
     print("   ✓ Rules deleted")
 
 
 def main():
-    # Initialize client
-    client = HorcruxClient(
+    # Initialize client; logout and cleanup happen on exit
+    with HorcruxClient(
         base_url="http://localhost:8006",
         username="admin",
         password="admin"
-    )
-
-    print("=" * 60)
-    print("Horcrux Advanced Examples")
-    print("=" * 60)
-
-    try:
-        # Create a test VM for demonstrations
-        print("\nSetting up test VM...")
-        vm = client.create_vm(
-            name="advanced-example-vm",
-            cpus=2,
-            memory=2048,
-            disk_size=20,
-            hypervisor="Qemu"
-        )
-        vm_id = vm['id']
-        print(f"✓ Created test VM: {vm_id}")
-
-        # Start the VM
-        client.start_vm(vm_id)
-        print("✓ Starting VM...")
-        client.wait_for_vm_status(vm_id, "running", timeout=60)
-
-        # Run examples
-        example_cluster_operations(client)
-        example_monitoring_and_alerts(client, vm_id)
-        example_snapshots_and_clones(client, vm_id)
-        example_high_availability(client, vm_id)
-        example_backup_and_restore(client, vm_id)
-        example_firewall(client)
-
-        # Cleanup
-        print("\n" + "=" * 60)
-        print("Cleaning up...")
+    ) as client:
         print("=" * 60)
-
-        client.stop_vm(vm_id, force=True)
-        client.wait_for_vm_status(vm_id, "stopped", timeout=60)
-        client.delete_vm(vm_id)
-        print("✓ Test VM deleted")
-
-        print("\n" + "=" * 60)
-        print("All advanced examples completed successfully!")
+        print("Horcrux Advanced Examples")
         print("=" * 60)
 
-    except HorcruxError as e:
-        print(f"\n✗ Error: {e.message}")
-        if e.status_code:
-            print(f"  Status code: {e.status_code}")
-        sys.exit(1)
-
-    finally:
-        client.logout()
+        try:
+            # Create a test VM for demonstrations
+            print("\nSetting up test VM...")
+            vm = client.create_and_start_vm(
+                name="advanced-example-vm",
+                cpus=2,
+                memory=2048,
+                disk_size=20,
+                hypervisor="Qemu",
+                wait_for="running",
+                timeout=60
+            )
+            vm_id = vm['id']
+            print(f"✓ Created and started test VM: {vm_id}")
+
+            # Run examples
+            example_cluster_operations(client)
+            example_monitoring_and_alerts(client, vm_id)
+            example_snapshots_and_clones(client, vm_id)
+            example_high_availability(client, vm_id)
+            example_backup_and_restore(client, vm_id)
+            example_firewall(client)
+
+            # Cleanup
+            print("\n" + "=" * 60)
+            print("Cleaning up...")
+            print("=" * 60)
+
+            client.stop_and_delete_vm(vm_id, force=True, timeout=60)
+            print("✓ Test VM deleted")
+
+            print("\n" + "=" * 60)
+            print("All advanced examples completed successfully!")
+            print("=" * 60)
+
+        except HorcruxError as e:
+            print(f"\n✗ Error: {e.message}")
+            if e.status_code:
+                print(f"  Status code: {e.status_code}")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -17,11 +17,171 @@ Example usage:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import HTTPError as Urllib3Error
+from urllib3.util.retry import Retry
+import functools
 import json
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Generator, Iterator, List, Optional, Any, Tuple, Union
 from datetime import datetime
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
+import atexit
+import os
+import socket
+import threading
 import time
 
+try:
+    import httpx
+except ImportError:  # only needed for the optional HTTP/2 transport
+    httpx = None
+
+try:
+    import aiohttp
+except ImportError:  # only needed for AsyncHorcruxClient
+    aiohttp = None
+
+try:
+    import requests_cache
+except ImportError:  # only needed for the optional persistent cache
+    requests_cache = None
+
+try:
+    import ijson
+except ImportError:  # stream_get() then decodes the whole body at once
+    ijson = None
+
+try:
+    import msgpack
+except ImportError:  # metric history falls back to JSON
+    msgpack = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # stdlib codec, slower on large payloads
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+# urllib3 already disables Nagle (TCP_NODELAY); also keep idle pooled
+# connections alive through NATs and firewalls
+_KEEPALIVE_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+# Endpoints that change rarely enough to keep on disk between runs. Exact
+# paths, so invalidating them needs no scan of the cache
+_PERSISTENT_CACHE_PATHS = ('/api/cluster/architecture', '/api/gpu/devices',
+                           '/api/gpu/iommu-status', '/api/alerts/rules')
+_PERSISTENT_CACHE_TTL = 300
+_MSGPACK_ACCEPT = 'application/msgpack, application/json;q=0.9'
+
+_USER_AGENT = 'horcrux-python-client'
+_TOKEN_CACHE_ENV = 'HORCRUX_TOKEN_CACHE'
+_TOKEN_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'horcrux', 'token')
+# Seconds before expiry at which a password login is renewed
+_TOKEN_REFRESH_MARGIN = 30
+
+if httpx is not None:
+    _TRANSPORT_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+else:
+    _TRANSPORT_ERRORS = (requests.exceptions.RequestException,)
+
+_ASYNC_TRANSPORT_ERRORS = (asyncio.TimeoutError,)
+if aiohttp is not None:
+    _ASYNC_TRANSPORT_ERRORS += (aiohttp.ClientError,)
+if httpx is not None:
+    _ASYNC_TRANSPORT_ERRORS += (httpx.HTTPError,)
+
+
+def _epoch_seconds(value: Union[datetime, int]) -> int:
+    """Convert a datetime (or pass through an epoch timestamp) to epoch seconds."""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def _encode_json(data: Any, headers: Optional[Dict]) -> Tuple[Optional[bytes], Optional[Dict]]:
+    """Serialize a request body to JSON bytes and add its Content-Type."""
+    if data is None:
+        return None, headers
+    return _json_dumps(data), {'Content-Type': 'application/json', **(headers or {})}
+
+
+def _compact(fields: Dict) -> Dict:
+    """Drop unset (None or empty-string) optional fields from a params/body dict."""
+    return {k: v for k, v in fields.items() if v is not None and v != ''}
+
+
+def _pick_by_id(items: List[Dict], ids: List[str]) -> Dict[str, Dict]:
+    """Map the requested IDs to their objects in a listing, in request order."""
+    by_id = {item['id']: item for item in items}
+    return {i: by_id[i] for i in ids if i in by_id}
+
+
+def _select_records(document: Any, record_path: str) -> Iterator[Any]:
+    """Yield the items an ijson-style prefix (e.g. "data.item") selects."""
+    nodes = [document]
+    for part in record_path.split('.') if record_path else ():
+        if part == 'item':
+            nodes = [item for node in nodes if isinstance(node, list) for item in node]
+        else:
+            nodes = [node[part] for node in nodes if isinstance(node, dict) and part in node]
+    return iter(nodes)
+
+
+async def _aiter_lines(chunks) -> Any:
+    """Split an async iterator of byte chunks into decoded lines."""
+    buffer = b''
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            yield line.rstrip(b'\r').decode('utf-8')
+    if buffer:
+        yield buffer.rstrip(b'\r').decode('utf-8')
+
+
+def _token_expiry(token: str) -> Optional[float]:
+    """Read the ``exp`` claim of a JWT without verifying it."""
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class _EventStreamParser:
+    """Incremental Server-Sent Events parser producing (event, data) pairs."""
+
+    def __init__(self):
+        self._event = 'message'
+        self._data = []
+
+    def feed(self, line: str) -> Optional[Tuple[str, Any]]:
+        """Consume one line; return a complete event when a blank line ends it."""
+        if line.startswith('event:'):
+            self._event = line[6:].strip()
+        elif line.startswith('data:'):
+            self._data.append(line[5:].lstrip())
+        elif not line:
+            event, data = self._event, self._data
+            self._event, self._data = 'message', []
+            if data:
+                payload = '\n'.join(data)
+                try:
+                    return event, _json_loads(payload)
+                except ValueError:
+                    return event, {'data': payload}
+        return None
+
 
 class HorcruxError(Exception):
     """Base exception for Horcrux API errors"""
@@ -32,36 +192,161 @@ class HorcruxError(Exception):
         super().__init__(self.message)
 
 
-class HorcruxClient:
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections set SO_KEEPALIVE on top of urllib3's defaults."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', HTTPConnection.default_socket_options
+                          + _KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+class BatchResult:
+    """Handle for a call queued in a batch, resolved when the batch is flushed."""
+
+    def __init__(self):
+        self._future = None
+
+    def result(self) -> Any:
+        """
+        Get the result of the queued call.
+
+        Raises:
+            HorcruxError: If the batch has not been flushed or the call failed
+        """
+        if self._future is None:
+            raise HorcruxError("Batch has not been flushed yet")
+        return self._future.result()
+
+
+class Batch:
     """
-    Complete client for the Horcrux virtualization API.
+    Queues client calls and dispatches them together.
 
-    Provides methods for managing VMs, containers, storage, clustering,
-    backups, and all other Horcrux features.
+    Any public client method can be called on the batch; it returns a
+    BatchResult instead of the response. On flush (or context manager exit)
+    all queued calls are sent concurrently over the client's pooled session.
     """
 
-    def __init__(self, base_url: str, username: str = None, password: str = None,
-                 api_key: str = None, verify_ssl: bool = True):
+    def __init__(self, client: 'HorcruxClient', max_workers: int = 8):
+        self._client = client
+        self._max_workers = max_workers
+        self._calls = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+        if name.startswith('_') or not callable(method):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs) -> BatchResult:
+            handle = BatchResult()
+            self._calls.append((method, args, kwargs, handle))
+            return handle
+
+        return queue
+
+    def flush(self) -> None:
         """
-        Initialize the Horcrux client.
+        Dispatch all queued calls and wait for them to finish.
 
-        Args:
-            base_url: Base URL of the Horcrux API (e.g., "http://localhost:8006")
-            username: Username for authentication (if using password auth)
-            password: Password for authentication (if using password auth)
-            api_key: API key for authentication (alternative to username/password)
-            verify_ssl: Whether to verify SSL certificates
+        Raises:
+            HorcruxError: The first error raised by a queued call
         """
-        self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.verify = verify_ssl
+        calls, self._calls = self._calls, []
+        if not calls:
+            return
+
+        workers = min(self._max_workers, len(calls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for method, args, kwargs, handle in calls:
+                handle._future = executor.submit(method, *args, **kwargs)
+
+        for _, _, _, handle in calls:
+            handle.result()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit; flushes queued calls."""
+        if exc_type is None:
+            self.flush()
+
+
+def _flow(method: Callable) -> Callable:
+    """
+    Turn a generator method into a call that works on both clients.
+
+    The generator yields every request it makes (a client method call, or
+    self._sleep()) and is sent back that call's result. The sync client's
+    calls have already run by then; the async client's are awaitables its
+    _run() awaits, throwing any exception back in at the yield.
+    """
+    @functools.wraps(method)
+    def run(self, *args, **kwargs):
+        return self._run(method(self, *args, **kwargs))
+    return run
+
+
+class _HorcruxClientBase:
+    """
+    The Horcrux API methods shared by HorcruxClient and AsyncHorcruxClient.
+
+    Nothing here touches the transport. Single requests end in _send(),
+    which each client implements; calls that need the result of another
+    request are written once as @_flow generators and driven by the
+    client's _run(), so the sync and async clients cannot drift apart.
+    """
+
+    def _init_state(self, username: Optional[str], cache_ttl: float,
+                    cache_size: int) -> None:
+        """Set up auth, feature-detection and cache state shared by all transports."""
         self.token = None
+        self.username = username
+        self._token_cache = os.environ.get(_TOKEN_CACHE_ENV) == '1'
+        self._long_poll_supported = True
+        self._metrics_query_supported = True
+        self._launch_supported = True
+        self._events_supported = True
+        self._msgpack_supported = msgpack is not None
+        self._realm = 'local'
+        self._auth_lock = threading.Lock()
+        self._header_lock = threading.Lock()
+        self._renew_at = None  # time.time() after which the token is renewed
+        self._renewing = False  # a _refresh_login() is in progress
+
+        self.cache_ttl = cache_ttl
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._refreshing = set()
+        # Bumped by every invalidation; a fetch that started under an older
+        # generation must not store its (possibly pre-write) result
+        self._cache_generation = 0
+        # VM and container listings change outside the client's control, so
+        # they are only cached once configure_cache() opts them in
+        self._cache_policies = {'/api/vms': (0, 0), '/api/containers': (0, 0)}
+
+    @_flow
+    def warm_up(self) -> bool:
+        """
+        Open a pooled connection before the first real call.
 
-        if api_key:
-            self.session.headers.update({'X-API-Key': api_key})
-        elif username and password:
-            self.login(username, password)
+        Sends a cheap HEAD /api/health so the TCP (and TLS) handshake is paid
+        up front. Called automatically for API key and cached-token
+        clients, which skip the login request.
+
+        Returns:
+            True if the server answered
+        """
+        try:
+            yield self._probe('/api/health', timeout=5)
+            return True
+        except HorcruxError:
+            return False
 
+    @_flow
     def login(self, username: str, password: str, realm: str = "local") -> Dict:
         """
         Authenticate with username and password.
@@ -74,22 +359,113 @@ class HorcruxClient:
         Returns:
             Authentication response with token
         """
-        response = self._post('/api/auth/login', {
+        response = yield self._post('/api/auth/login', {
             'username': username,
             'password': password,
             'realm': realm
         })
 
-        self.token = response['token']
-        self.session.headers.update({'Authorization': f'Bearer {self.token}'})
+        self.username = username
+        self._password = password
+        self._realm = realm
+        self._set_token(response['token'])
+        self._save_cached_token()
         return response
 
+    @_flow
     def logout(self) -> None:
         """Logout and invalidate the current session."""
+        self._password = None
         if self.token:
-            self._post('/api/auth/logout')
-            self.token = None
-            del self.session.headers['Authorization']
+            yield self._post('/api/auth/logout')
+            self._set_token(None)
+            self._drop_cached_token()
+
+    def _set_token(self, token: Optional[str]) -> None:
+        """Set (or clear) the bearer token sent with every request."""
+        # Requests copy self.headers while a refresh may be replacing the
+        # token on another thread, so swap in a new dict instead of mutating
+        with self._header_lock:
+            headers = {k: v for k, v in self.headers.items() if k != 'Authorization'}
+            if token:
+                headers['Authorization'] = f'Bearer {token}'
+            self.headers = headers
+            self.token = token
+            self._renew_at = self._renewal_time(token)
+
+    def _renewal_time(self, token: Optional[str]) -> Optional[float]:
+        """When a token should be renewed, or None if it can't be."""
+        expires = _token_expiry(token) if token else None
+        if expires is None or self._password is None:
+            return None
+        renew_at = expires - _TOKEN_REFRESH_MARGIN
+        if renew_at <= time.time() and self._renewing:
+            # The renewal itself returned a token this short-lived: logging
+            # in again would only get another one, so let it run out
+            return None
+        return renew_at
+
+    def _login_due(self) -> bool:
+        """Whether the next request must first log in or renew the token."""
+        if self.token is None:
+            return self._password is not None
+        # Renewed on the request path rather than by a timer, which would
+        # keep a dropped client alive and logging in for the process lifetime
+        return self._renew_at is not None and time.time() >= self._renew_at
+
+    @_flow
+    def _refresh_login(self) -> None:
+        """Log in again shortly before the token expires, keeping it on failure."""
+        if self._password is None:
+            return
+        self._renewing = True
+        try:
+            yield self.login(self.username, self._password, self._realm)
+        except HorcruxError:
+            pass
+        finally:
+            self._renewing = False
+
+    def _load_cached_token(self) -> bool:
+        """Reuse a persisted, unexpired token for this server and user."""
+        if not self._token_cache:
+            return False
+        try:
+            with open(_TOKEN_CACHE_PATH) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if (cached.get('base_url') != self.base_url or
+                cached.get('username') != self.username or
+                cached.get('expires', 0) <= time.time() + 60):
+            return False
+
+        self._set_token(cached['token'])
+        return True
+
+    def _save_cached_token(self) -> None:
+        """Persist the current token (owner-only) if token caching is enabled."""
+        expires = _token_expiry(self.token)
+        if not self._token_cache or expires is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(_TOKEN_CACHE_PATH), mode=0o700, exist_ok=True)
+            fd = os.open(_TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'base_url': self.base_url, 'username': self.username,
+                           'token': self.token, 'expires': expires}, f)
+        except OSError:
+            pass
+
+    def _drop_cached_token(self) -> None:
+        """Remove the persisted token after an explicit logout."""
+        if not self._token_cache:
+            return
+        try:
+            os.remove(_TOKEN_CACHE_PATH)
+        except OSError:
+            pass
 
     # ========================================
     # Virtual Machines
@@ -106,18 +482,34 @@ class HorcruxClient:
         Returns:
             List of VM objects
         """
-        params = {}
-        if status:
-            params['status'] = status
-        if hypervisor:
-            params['hypervisor'] = hypervisor
+        return self._cached_get('/api/vms', params=_compact(
+            {'status': status, 'hypervisor': hypervisor}))
+
+    def iter_vms(self, status: str = None, hypervisor: str = None) -> Iterator[Dict]:
+        """
+        Iterate over all virtual machines without loading the whole list.
 
-        return self._get('/api/vms', params=params)
+        Same filters as list_vms(); VMs are decoded one at a time as the
+        response streams in (see stream_get()).
+        """
+        return self.stream_get('/api/vms', params=_compact(
+            {'status': status, 'hypervisor': hypervisor}))
 
     def get_vm(self, vm_id: str) -> Dict:
         """Get details for a specific VM."""
         return self._get(f'/api/vms/{vm_id}')
 
+    @_flow
+    def get_vms(self, vm_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get details for several VMs with a single request.
+
+        Returns:
+            Mapping of VM ID to VM object; unknown IDs are omitted
+        """
+        vms = yield self._get('/api/vms')
+        return _pick_by_id(vms, list(vm_ids))
+
     def create_vm(self, name: str, cpus: int = 2, memory: int = 2048,
                   disk_size: int = 20, hypervisor: str = "Qemu",
                   architecture: str = "X86_64", **kwargs) -> Dict:
@@ -175,6 +567,85 @@ class HorcruxClient:
         """
         return self._delete(f'/api/vms/{vm_id}', params={'purge': purge})
 
+    @_flow
+    def create_and_start_vm(self, name: str, cpus: int = 2, memory: int = 2048,
+                            disk_size: int = 20, hypervisor: str = "Qemu",
+                            architecture: str = "X86_64",
+                            wait_for: str = "running", timeout: int = 60,
+                            **kwargs) -> Dict:
+        """
+        Create a VM, start it and wait until it reaches a status.
+
+        The whole chain is submitted as one server-side launch operation.
+        On servers without the launch endpoint it falls back to create_vm(),
+        start_vm() and wait_for_vm_status().
+
+        Args:
+            name: VM name
+            cpus: Number of CPU cores
+            memory: Memory in MB
+            disk_size: Disk size in GB
+            hypervisor: Hypervisor type ("Qemu", "Lxd", "Incus")
+            architecture: Architecture ("X86_64", "Aarch64", "Riscv64", "Ppc64le")
+            wait_for: Status to wait for, or None to return once started
+            timeout: Maximum time to wait in seconds
+            **kwargs: Additional VM configuration
+
+        Returns:
+            VM object; check its 'status' to see whether wait_for was reached
+        """
+        data = {
+            'name': name,
+            'cpus': cpus,
+            'memory': memory,
+            'disk_size': disk_size,
+            'hypervisor': hypervisor,
+            'architecture': architecture,
+            **kwargs
+        }
+
+        if self._launch_supported:
+            try:
+                return (yield self._request('POST', '/api/vms/launch', data={
+                    'create': data,
+                    'then': 'start',
+                    'wait_for': wait_for,
+                    'timeout': timeout
+                }, timeout=timeout + 30))
+            except HorcruxError as e:
+                if not self._route_unsupported(e):
+                    raise
+                self._launch_supported = False
+
+        vm = yield self._post('/api/vms', data)
+        yield self.start_vm(vm['id'])
+        if wait_for:
+            if (yield self.wait_for_vm_status(vm['id'], wait_for, timeout=timeout)):
+                vm['status'] = wait_for
+            else:
+                vm = yield self.get_vm(vm['id'])
+        return vm
+
+    @_flow
+    def stop_and_delete_vm(self, vm_id: str, force: bool = False,
+                           timeout: int = 60, purge: bool = True) -> Dict:
+        """
+        Stop a VM, wait for it to stop and delete it.
+
+        Args:
+            vm_id: VM ID
+            force: Force stop (kill) instead of graceful shutdown
+            timeout: Seconds to wait for the VM to stop
+            purge: Delete disk images
+
+        Raises:
+            HorcruxError: If the VM does not stop within the timeout
+        """
+        yield self.stop_vm(vm_id, force=force, timeout=timeout)
+        if not (yield self.wait_for_vm_status(vm_id, "stopped", timeout=timeout)):
+            raise HorcruxError(f"VM {vm_id} did not stop within {timeout}s")
+        return (yield self.delete_vm(vm_id, purge=purge))
+
     # ========================================
     # VM Snapshots
     # ========================================
@@ -257,13 +728,24 @@ class HorcruxClient:
         """List all clone jobs."""
         return self._get('/api/clone-jobs')
 
+    @_flow
+    def get_clone_jobs(self, job_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get the status of several clone jobs with a single request.
+
+        Returns:
+            Mapping of job ID to clone job; unknown IDs are omitted
+        """
+        jobs = yield self.list_clone_jobs()
+        return _pick_by_id(jobs, list(job_ids))
+
     # ========================================
     # Containers
     # ========================================
 
     def list_containers(self) -> List[Dict]:
         """List all containers."""
-        return self._get('/api/containers')
+        return self._cached_get('/api/containers')
 
     def create_container(self, name: str, runtime: str = "Lxc",
                         image: str = "ubuntu:22.04", cpus: int = 2,
@@ -325,7 +807,7 @@ class HorcruxClient:
 
     def list_storage_pools(self) -> List[Dict]:
         """List all storage pools."""
-        return self._get('/api/storage/pools')
+        return self._cached_get('/api/storage/pools')
 
     def get_storage_pool(self, pool_id: str) -> Dict:
         """Get storage pool details."""
@@ -382,11 +864,8 @@ class HorcruxClient:
 
     def restore_backup(self, backup_id: str, target_vm_id: str = None) -> Dict:
         """Restore a backup."""
-        data = {}
-        if target_vm_id:
-            data['target_vm_id'] = target_vm_id
-
-        return self._post(f'/api/backups/{backup_id}/restore', data)
+        return self._post(f'/api/backups/{backup_id}/restore',
+                          _compact({'target_vm_id': target_vm_id}))
 
     def delete_backup(self, backup_id: str) -> Dict:
         """Delete a backup."""
@@ -398,7 +877,7 @@ class HorcruxClient:
 
     def list_cluster_nodes(self) -> List[Dict]:
         """List all cluster nodes."""
-        return self._get('/api/cluster/nodes')
+        return self._cached_get('/api/cluster/nodes')
 
     def add_cluster_node(self, name: str, address: str, architecture: str) -> Dict:
         """
@@ -416,7 +895,7 @@ class HorcruxClient:
 
     def get_cluster_architecture(self) -> Dict:
         """Get cluster architecture summary."""
-        return self._get('/api/cluster/architecture')
+        return self._cached_get('/api/cluster/architecture')
 
     # ========================================
     # High Availability
@@ -424,7 +903,7 @@ class HorcruxClient:
 
     def list_ha_resources(self) -> List[Dict]:
         """List HA resources."""
-        return self._get('/api/ha/resources')
+        return self._cached_get('/api/ha/resources')
 
     def add_ha_resource(self, vm_id: str, priority: int = 100,
                        group: str = None) -> Dict:
@@ -448,7 +927,7 @@ class HorcruxClient:
 
     def get_ha_status(self) -> Dict:
         """Get HA system status."""
-        return self._get('/api/ha/status')
+        return self._cached_get('/api/ha/status')
 
     # ========================================
     # Migration
@@ -494,24 +973,142 @@ class HorcruxClient:
         """Get statistics for all VMs."""
         return self._get('/api/monitoring/vms')
 
-    def get_metric_history(self, metric: str, start: datetime = None,
-                          end: datetime = None, interval: int = 60) -> Dict:
+    @_flow
+    def get_vm_stats_many(self, vm_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get statistics for several VMs with a single request.
+
+        Returns:
+            Mapping of VM ID to its statistics; VMs without stats are omitted
+        """
+        stats = yield self.get_all_vm_stats()
+        return _pick_by_id(stats, list(vm_ids))
+
+    @_flow
+    def get_vm_stats_bulk(self, vm_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get statistics for several VMs concurrently, one request per VM.
+
+        Returns:
+            Mapping of VM ID to its statistics
+        """
+        vm_ids = list(vm_ids)
+        stats = yield self.bulk(vm_ids, self.get_vm_stats)
+        return dict(zip(vm_ids, stats))
+
+    def get_metric_history(self, metric: str, start: Union[datetime, int] = None,
+                          end: Union[datetime, int] = None, interval: int = 60,
+                          target_type: str = None, target_id: str = None) -> Dict:
         """
         Get historical metrics.
 
         Args:
             metric: Metric name (e.g., "cpu_usage", "memory_usage")
-            start: Start time
-            end: End time
+            start: Start time as a datetime or Unix epoch seconds
+            end: End time as a datetime or Unix epoch seconds
+            interval: Sample interval in seconds
+            target_type: Optional target type ("node", "vm", "container")
+            target_id: Optional target ID
+        """
+        params = self._metric_history_params(start, end, interval,
+                                             target_type, target_id)
+        return self._request_compact('GET', f'/api/monitoring/history/{metric}',
+                                     params=params)
+
+    def get_metric_history_window(self, metric: str, seconds_back: int,
+                                  interval: int = 60, target_type: str = None,
+                                  target_id: str = None) -> Dict:
+        """
+        Get a metric's history for the last seconds_back seconds.
+
+        Convenience for dashboards polling a sliding window; the range is
+        sent as epoch seconds computed from the current time.
+        """
+        now = int(time.time())
+        return self.get_metric_history(metric, start=now - seconds_back, end=now,
+                                       interval=interval, target_type=target_type,
+                                       target_id=target_id)
+
+    def iter_metric_history(self, metric: str, start: Union[datetime, int] = None,
+                            end: Union[datetime, int] = None, interval: int = 60,
+                            target_type: str = None,
+                            target_id: str = None) -> Iterator[Dict]:
+        """
+        Iterate over a metric's data points without loading the whole series.
+
+        Same arguments as get_metric_history(); points are decoded one at a
+        time as the response streams in (see stream_get()).
+        """
+        params = self._metric_history_params(start, end, interval,
+                                             target_type, target_id)
+        return self.stream_get(f'/api/monitoring/history/{metric}', params=params)
+
+    @staticmethod
+    def _metric_history_params(start: Union[datetime, int, None],
+                               end: Union[datetime, int, None], interval: int,
+                               target_type: Optional[str],
+                               target_id: Optional[str]) -> Dict:
+        """Build the query parameters for a metric history request."""
+        return _compact({
+            'interval': interval,
+            'from': _epoch_seconds(start) if start is not None else None,
+            'to': _epoch_seconds(end) if end is not None else None,
+            'target_type': target_type,
+            'target_id': target_id,
+        })
+
+    @_flow
+    def get_metrics_history(self, metrics: List[str], targets: List[tuple] = None,
+                           start: Union[datetime, int] = None,
+                           end: Union[datetime, int] = None,
+                           interval: int = 60) -> Dict:
+        """
+        Get historical data for several metrics and targets in one request.
+
+        Falls back to one get_metric_history() call per metric and target,
+        sent concurrently with bulk(), on servers without the multi-metric query endpoint.
+
+        Args:
+            metrics: Metric names (e.g., ["cpu_usage", "memory_usage"])
+            targets: (target_type, target_id) pairs, e.g. [("vm", "vm-100")];
+                     defaults to [("node", "all")]
+            start: Start time as a datetime or Unix epoch seconds
+            end: End time as a datetime or Unix epoch seconds
             interval: Sample interval in seconds
+
+        Returns:
+            Mapping of "target_type:target_id" to a mapping of metric name
+            to its history
         """
-        params = {'interval': interval}
-        if start:
-            params['start'] = start.isoformat()
-        if end:
-            params['end'] = end.isoformat()
+        targets = targets or [('node', 'all')]
 
-        return self._get(f'/api/monitoring/history/{metric}', params=params)
+        if self._metrics_query_supported:
+            query = {'interval': interval}
+            if start is not None:
+                query['from'] = _epoch_seconds(start)
+            if end is not None:
+                query['to'] = _epoch_seconds(end)
+
+            try:
+                return (yield self._request_compact('POST', '/api/monitoring/history', {
+                    'metrics': metrics,
+                    'targets': [{'type': t, 'id': i} for t, i in targets],
+                    'range': query
+                }))
+            except HorcruxError as e:
+                if not self._route_unsupported(e):
+                    raise
+                self._metrics_query_supported = False
+
+        keys = [(f'{t}:{i}', t, i, metric) for t, i in targets for metric in metrics]
+        results = yield self.bulk(keys, lambda key: self.get_metric_history(
+            key[3], start=start, end=end, interval=interval,
+            target_type=key[1], target_id=key[2]))
+
+        history = {}
+        for (target, _, _, metric), result in zip(keys, results):
+            history.setdefault(target, {})[metric] = result
+        return history
 
     # ========================================
     # Alerts
@@ -519,7 +1116,7 @@ class HorcruxClient:
 
     def list_alert_rules(self) -> List[Dict]:
         """List all alert rules."""
-        return self._get('/api/alerts/rules')
+        return self._cached_get('/api/alerts/rules')
 
     def create_alert_rule(self, name: str, metric: str, threshold: float,
                          condition: str = "greater_than", severity: str = "warning",
@@ -553,11 +1150,8 @@ class HorcruxClient:
 
     def acknowledge_alert(self, rule_id: str, target: str, comment: str = None) -> Dict:
         """Acknowledge an alert."""
-        data = {}
-        if comment:
-            data['comment'] = comment
-
-        return self._post(f'/api/alerts/{rule_id}/{target}/acknowledge', data)
+        return self._post(f'/api/alerts/{rule_id}/{target}/acknowledge',
+                          _compact({'comment': comment}))
 
     # ========================================
     # Firewall
@@ -565,7 +1159,7 @@ class HorcruxClient:
 
     def list_firewall_rules(self) -> List[Dict]:
         """List all firewall rules."""
-        return self._get('/api/firewall/rules')
+        return self._cached_get('/api/firewall/rules')
 
     def add_firewall_rule(self, name: str, action: str, protocol: str,
                          port: int = None, source: str = "0.0.0.0/0",
@@ -612,7 +1206,7 @@ class HorcruxClient:
 
     def list_gpu_devices(self) -> List[Dict]:
         """List all GPU devices."""
-        return self._get('/api/gpu/devices')
+        return self._cached_get('/api/gpu/devices')
 
     def scan_gpu_devices(self) -> Dict:
         """Scan for GPU devices."""
@@ -628,101 +1222,435 @@ class HorcruxClient:
 
     def check_iommu_status(self) -> Dict:
         """Check IOMMU status."""
-        return self._get('/api/gpu/iommu-status')
+        return self._cached_get('/api/gpu/iommu-status')
 
     # ========================================
     # Helper Methods
     # ========================================
 
-    def wait_for_vm_status(self, vm_id: str, target_status: str,
+    def snapshot_many(self, vm_ids: List[str], name: str,
+                      description: str = None) -> List[Dict]:
+        """Create a snapshot with the same name on several VMs concurrently."""
+        return self.bulk(vm_ids, lambda vm_id: self.create_snapshot(
+            vm_id, name, description=description))
+
+    def delete_vms(self, vm_ids: List[str], purge: bool = True) -> List[Dict]:
+        """Delete several VMs concurrently."""
+        return self.bulk(vm_ids, lambda vm_id: self.delete_vm(vm_id, purge=purge))
+
+    def clear_cache(self) -> None:
+        """Discard all cached responses."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_generation += 1
+
+    def configure_cache(self, path_prefix: str, ttl_seconds: float,
+                        stale_seconds: float = 0) -> None:
+        """
+        Set the caching policy for cached listings under an API path.
+
+        Within ttl_seconds a cached response is returned as is. For a further
+        stale_seconds it is still returned immediately while a background
+        request refreshes it (stale-while-revalidate).
+
+        Example:
+            client.configure_cache('/api/vms', ttl_seconds=2, stale_seconds=10)
+
+        Args:
+            path_prefix: API path prefix (e.g., "/api/vms", "/api/alerts")
+            ttl_seconds: Seconds a response is fresh (0 disables caching)
+            stale_seconds: Extra seconds a response may be served while refreshing
+        """
+        with self._cache_lock:
+            self._cache_policies[path_prefix.rstrip('/')] = (ttl_seconds, stale_seconds)
+
+    @_flow
+    def wait_for_vm_status(self, vm_id: Union[str, List[str]], target_status: str,
                           timeout: int = 300, interval: int = 5) -> bool:
         """
-        Wait for a VM to reach a specific status.
+        Wait for a VM (or several VMs) to reach a specific status.
+
+        Polls start 0.2s apart and back off exponentially up to interval.
+        Each poll sends the last ETag, so an unchanged VM costs a 304. A list
+        of VMs is polled with one listing request per tick.
 
         Args:
-            vm_id: VM ID
+            vm_id: VM ID, or a list of VM IDs that must all reach the status
             target_status: Target status to wait for
             timeout: Maximum time to wait in seconds
-            interval: Check interval in seconds
+            interval: Maximum interval between checks in seconds
 
         Returns:
             True if status reached, False if timeout
         """
         start_time = time.time()
+        if not isinstance(vm_id, str):
+            return (yield from self._wait_for_vms_status(vm_id, target_status,
+                                                         timeout, interval))
+
+        vm = yield from self._long_poll(f'/api/vms/{vm_id}/wait',
+                                        {'status': target_status}, timeout)
+        if vm is not None and vm.get('status') == target_status:
+            return True
 
+        delay, etag = 0.2, None
         while time.time() - start_time < timeout:
             try:
-                vm = self.get_vm(vm_id)
-                if vm['status'] == target_status:
+                vm, etag = yield from self._conditional_get(f'/api/vms/{vm_id}', etag)
+                if vm is not None and vm['status'] == target_status:
                     return True
             except HorcruxError:
                 pass
 
-            time.sleep(interval)
+            yield self._sleep(delay)
+            delay = min(delay * 2, interval)
 
         return False
 
-    def wait_for_backup(self, backup_id: str, timeout: int = 3600) -> Dict:
-        """Wait for a backup to complete."""
+    def _wait_for_vms_status(self, vm_ids: List[str], target_status: str,
+                             timeout: int, interval: int) -> Generator:
+        """Poll several VMs at once until all reach target_status (a flow step)."""
+        start_time = time.time()
+        pending = set(vm_ids)
+        delay = 0.2
+        while pending:
+            try:
+                vms = yield self.get_vms(pending)
+                pending -= {i for i, vm in vms.items() if vm['status'] == target_status}
+            except HorcruxError:
+                pass
+
+            if not pending or time.time() - start_time >= timeout:
+                break
+            yield self._sleep(delay)
+            delay = min(delay * 2, interval)
+
+        return not pending
+
+    @_flow
+    def wait_for_backup(self, backup_id: str, timeout: int = 3600,
+                        progress_callback: Callable[[Dict], None] = None,
+                        interval: int = 5) -> Dict:
+        """
+        Wait for a backup to complete.
+
+        Progress is streamed from the backup's event stream when the server
+        provides one; otherwise the backup is long-polled or polled with
+        exponential backoff.
+
+        Args:
+            backup_id: Backup ID
+            timeout: Maximum time to wait in seconds
+            progress_callback: Called with each progress event
+            interval: Maximum interval between polls in seconds
+
+        Returns:
+            Completed backup object
+        """
         start_time = time.time()
 
+        if self._events_supported:
+            def on_event(event: str, data: Dict) -> Optional[Dict]:
+                if event == 'completed':
+                    return data
+                elif event == 'failed':
+                    raise HorcruxError(f"Backup failed: {data.get('error', 'Unknown error')}")
+                elif progress_callback:
+                    progress_callback(data)
+
+                if time.time() - start_time >= timeout:
+                    raise HorcruxError("Backup timeout")
+                return None
+
+            try:
+                backup = yield self._watch_events(f'/api/backups/{backup_id}/events',
+                                                  timeout, on_event)
+                if backup is not None:
+                    return backup
+            except HorcruxError as e:
+                if not self._route_unsupported(e):
+                    raise
+                self._events_supported = False
+
+        remaining = timeout - (time.time() - start_time)
+        backup = yield from self._long_poll(f'/api/backups/{backup_id}/wait',
+                                            {'status': 'completed'}, remaining)
+
+        delay, etag = 0.2, None
         while time.time() - start_time < timeout:
-            backup = self._get(f'/api/backups/{backup_id}')
+            if backup is None:
+                backup, etag = yield from self._conditional_get(
+                    f'/api/backups/{backup_id}', etag)
 
-            if backup['status'] == 'completed':
-                return backup
-            elif backup['status'] == 'failed':
-                raise HorcruxError(f"Backup failed: {backup.get('error', 'Unknown error')}")
+            if backup is not None:
+                if backup['status'] == 'completed':
+                    return backup
+                elif backup['status'] == 'failed':
+                    raise HorcruxError(f"Backup failed: {backup.get('error', 'Unknown error')}")
 
-            time.sleep(5)
+            backup = None
+            yield self._sleep(delay)
+            delay = min(delay * 2, interval)
 
         raise HorcruxError("Backup timeout")
 
+    def _conditional_get(self, path: str, etag: Optional[str]) -> Generator:
+        """
+        GET a polled resource, revalidating with the ETag from the last poll.
+
+        A flow step, used with ``yield from``.
+
+        Returns:
+            (resource, etag), with resource None when unchanged (304)
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        response = yield self._send('GET', path, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        return self._handle_response(response), response.headers.get('ETag')
+
+    def _long_poll(self, path: str, params: Dict, timeout: float) -> Generator:
+        """
+        Block server-side until a resource reaches the requested state.
+
+        A flow step, used with ``yield from``.
+
+        Returns:
+            The resource as returned by the server, or None if the server
+            does not support long-polling, in which case the caller should
+            fall back to polling.
+
+        Raises:
+            HorcruxError: For any other error, e.g. a 404 for a missing resource
+        """
+        if not self._long_poll_supported:
+            return None
+
+        try:
+            return (yield self._get(path, params={**params, 'timeout': int(timeout)},
+                                    timeout=timeout + 5))
+        except HorcruxError as e:
+            if not self._route_unsupported(e):
+                raise
+            self._long_poll_supported = False
+            return None
+
+    @staticmethod
+    def _route_unsupported(error: HorcruxError) -> bool:
+        """
+        Check whether an error means the server lacks an optional route.
+
+        405/501 always do. A 404 only does when it carries no JSON error
+        body; the API answers a missing resource with one, while an unknown
+        route gets a bare 404.
+        """
+        if error.status_code in (405, 501):
+            return True
+        if error.status_code != 404:
+            return False
+        body = error.response
+        return not (isinstance(body, dict) and ('error' in body or 'message' in body))
+
     # ========================================
     # Internal HTTP Methods
     # ========================================
 
+    @_flow
     def _request(self, method: str, path: str, data: Dict = None,
-                params: Dict = None) -> Any:
+                params: Dict = None, timeout: float = 30,
+                headers: Dict = None) -> Any:
         """Make an HTTP request to the API."""
-        url = f"{self.base_url}{path}"
-
         try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                timeout=30
-            )
-
-            # Handle empty responses
-            if response.status_code == 204 or not response.content:
-                return {}
+            response = yield self._send(method, path, data=data, params=params,
+                                        timeout=timeout, headers=headers)
+        finally:
+            # Invalidate once the write has landed (or failed part-way), so
+            # a read racing with it can't re-cache the pre-write state.
+            if method != 'GET':
+                self._invalidate(path)
+        return self._handle_response(response)
+
+    @_flow
+    def _request_compact(self, method: str, path: str, data: Dict = None,
+                         params: Dict = None) -> Any:
+        """
+        Make a request that prefers a MessagePack response body.
 
+        Used for numeric-heavy responses such as metric history. Falls back
+        to plain JSON when msgpack is not installed or the server answers
+        406 Not Acceptable.
+        """
+        if self._msgpack_supported:
+            try:
+                return (yield self._request(method, path, data=data, params=params,
+                                            headers={'Accept': _MSGPACK_ACCEPT}))
+            except HorcruxError as e:
+                if e.status_code != 406:
+                    raise
+                self._msgpack_supported = False
+
+        return (yield self._request(method, path, data=data, params=params))
+
+    def _handle_response(self, response: Any) -> Any:
+        """Decode a response body, raising HorcruxError for error statuses."""
+        status_code = response.status_code
+        # Empty bodies are recognised from the headers without reading them
+        if status_code == 204 or response.headers.get('Content-Length') == '0':
+            content = b''
+        else:
+            content = response.content
+
+        # Handle empty responses
+        if not content:
+            result = {}
+        elif (msgpack is not None and
+              response.headers.get('Content-Type', '').startswith('application/msgpack')):
+            result = msgpack.unpackb(content, raw=False)
+        else:
             # Try to parse JSON
             try:
-                result = response.json()
-            except json.JSONDecodeError:
-                result = {'data': response.text}
-
-            # Check for errors
-            if response.status_code >= 400:
-                error_msg = result.get('message', result.get('error', 'Unknown error'))
-                raise HorcruxError(
-                    message=error_msg,
-                    status_code=response.status_code,
-                    response=result
-                )
-
-            return result
+                result = _json_loads(content)
+            except ValueError:
+                result = {'data': content.decode('utf-8', errors='replace')}
+
+        if status_code >= 400:
+            self._raise_error(status_code, result)
+        return result
+
+    @staticmethod
+    def _raise_error(status_code: int, result: Any) -> None:
+        """Raise the HorcruxError for an error response body."""
+        error_msg = 'Unknown error'
+        if isinstance(result, dict):
+            error_msg = result.get('message', result.get('error', error_msg))
+        raise HorcruxError(
+            message=error_msg,
+            status_code=status_code,
+            response=result
+        )
+
+    @_flow
+    def _cached_get(self, path: str, params: Dict = None) -> Any:
+        """
+        Make a GET request, serving repeated calls from the response cache.
 
-        except requests.exceptions.RequestException as e:
-            raise HorcruxError(f"Request failed: {str(e)}")
+        Entries live for cache_ttl seconds. Once expired, the stored ETag (if
+        any) is sent as If-None-Match so an unchanged resource costs a 304
+        instead of a full body.
+        """
+        ttl, stale = self._cache_policy(path)
+        if ttl <= 0 and stale <= 0:
+            return (yield self._get(path, params=params))
+
+        key = (path, tuple(sorted(params.items())) if params else ())
+        entry = self._cache_lookup(key)
+        if entry is not None:
+            now = time.monotonic()
+            if entry[0] > now:
+                return entry[3]
+            if entry[1] > now:
+                if self._claim_refresh(key):
+                    self._in_background(self._refresh_cached, key, path, params)
+                return entry[3]
+
+        return (yield from self._fetch_cached(key, path, params, entry))
+
+    def _fetch_cached(self, key: tuple, path: str, params: Optional[Dict],
+                      entry: Optional[tuple]) -> Generator:
+        """GET a cached path, revalidating with the entry's ETag (a flow step)."""
+        headers = None
+        if entry is not None and entry[2]:
+            headers = {'If-None-Match': entry[2]}
+
+        generation = self._cache_generation
+        response = yield self._send('GET', path, params=params, headers=headers)
+        return self._cache_store(key, entry, response, generation)
+
+    @_flow
+    def _refresh_cached(self, key: tuple, path: str, params: Optional[Dict]) -> None:
+        """Background refresh of a stale entry; failures keep the stale copy."""
+        try:
+            yield from self._fetch_cached(key, path, params, self._cache_lookup(key))
+        except HorcruxError:
+            pass
+        finally:
+            with self._cache_lock:
+                self._refreshing.discard(key)
+
+    def _claim_refresh(self, key: tuple) -> bool:
+        """Mark a key as being refreshed; False if a refresh is already running."""
+        with self._cache_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _cache_policy(self, path: str) -> Tuple[float, float]:
+        """Get (ttl, stale) for a path from the longest matching configured prefix."""
+        with self._cache_lock:
+            matches = [prefix for prefix in self._cache_policies
+                       if path == prefix or path.startswith(prefix + '/')]
+            if matches:
+                return self._cache_policies[max(matches, key=len)]
+        return self.cache_ttl, 0
+
+    def _cache_lookup(self, key: tuple) -> Optional[tuple]:
+        """Get the (expires, stale_until, etag, result) entry for a key, if any."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+        return entry
+
+    def _cache_store(self, key: tuple, entry: Optional[tuple], response: Any,
+                     generation: int) -> Any:
+        """
+        Decode a (possibly 304) response and store it under key.
 
-    def _get(self, path: str, params: Dict = None) -> Any:
+        The result is not stored if the cache was invalidated since the
+        request started (generation no longer current).
+        """
+        if response.status_code == 304 and entry is not None:
+            result = entry[3]
+        else:
+            result = self._handle_response(response)
+
+        ttl, stale = self._cache_policy(key[0])
+        expires = time.monotonic() + ttl
+        with self._cache_lock:
+            if generation != self._cache_generation:
+                return result
+            self._cache[key] = (expires, expires + stale,
+                                response.headers.get('ETag'), result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def _invalidate(self, path: str) -> None:
+        """Drop cached responses for the resource collection a path belongs to."""
+        prefix = '/'.join(path.split('/')[:3])
+        with self._cache_lock:
+            self._cache_generation += 1
+            stale = [k for k in self._cache
+                     if k[0] == prefix or k[0].startswith(prefix + '/')]
+            for key in stale:
+                del self._cache[key]
+
+        if requests_cache is not None and isinstance(self.session, requests_cache.CachedSession):
+            stale_urls = [f"{self.base_url}{p}" for p in _PERSISTENT_CACHE_PATHS
+                          if p == prefix or p.startswith(prefix + '/')]
+            if stale_urls:
+                # The cache key includes verify as requests resolves it per
+                # request (session setting, then CA bundle environment)
+                verify = self.session.merge_environment_settings(
+                    self.base_url, {}, None, None, None)['verify']
+                self.session.cache.delete(urls=stale_urls, verify=verify, vacuum=False)
+
+    def _get(self, path: str, params: Dict = None, timeout: float = 30) -> Any:
         """Make a GET request."""
-        return self._request('GET', path, params=params)
+        return self._request('GET', path, params=params, timeout=timeout)
 
     def _post(self, path: str, data: Dict = None) -> Any:
         """Make a POST request."""
@@ -736,10 +1664,674 @@ class HorcruxClient:
         """Make a DELETE request."""
         return self._request('DELETE', path, params=params)
 
+
+class HorcruxClient(_HorcruxClientBase):
+    """
+    Complete client for the Horcrux virtualization API.
+
+    Provides methods for managing VMs, containers, storage, clustering,
+    backups, and all other Horcrux features.
+    """
+
+    def __init__(self, base_url: str, username: str = None, password: str = None,
+                 api_key: str = None, verify_ssl: bool = True,
+                 pool_connections: int = 1, pool_maxsize: int = 32,
+                 cache_ttl: float = 5.0, cache_size: int = 256,
+                 http2: bool = False, unix_socket: str = None,
+                 persistent_cache: str = None, session: Any = None):
+        """
+        Initialize the Horcrux client.
+
+        All requests made by the client share one pooled keep-alive session,
+        so a single client should be reused for a whole script rather than
+        created per call. Password clients log in on the first request rather
+        than here, and renew their token in the background shortly before it
+        expires. Code that has to create clients repeatedly (for
+        example per web request, each with its own credentials) can pass one
+        long-lived session to all of them to keep the connections warm.
+
+        Args:
+            base_url: Base URL of the Horcrux API (e.g., "http://localhost:8006")
+            username: Username for authentication (if using password auth)
+            password: Password for authentication (if using password auth)
+            api_key: API key for authentication (alternative to username/password)
+            verify_ssl: Whether to verify SSL certificates
+            pool_connections: Number of per-host connection pools to cache
+            pool_maxsize: Maximum number of keep-alive connections per host
+            cache_ttl: Seconds to cache read-mostly listings (0 disables)
+            cache_size: Maximum number of cached responses
+            http2: Use an HTTP/2 transport (requires ``httpx[http2]``) so
+                concurrent calls multiplex over a single connection
+            unix_socket: Path of a Unix domain socket to connect through
+                instead of TCP (requires ``httpx``); base_url still supplies
+                the Host header and URL paths
+            persistent_cache: Path of an SQLite file (requires
+                ``requests-cache``) that keeps rarely-changing responses
+                such as cluster architecture and GPU devices across runs;
+                not available with the httpx transports
+            session: An existing requests.Session or httpx.Client to send
+                requests through; the transport options above are ignored
+                and close() leaves the session open
+        """
+        self.base_url = base_url.rstrip('/')
+        # Auth headers are kept per client so a shared session never
+        # carries another client's credentials
+        self.headers = {}
+        if persistent_cache and (http2 or unix_socket):
+            raise ValueError("persistent_cache requires the default requests transport")
+        self._owns_session = session is None
+        self._password = None if api_key else password
+        if session is not None:
+            self.session = session
+        elif http2 or unix_socket:
+            self.session = self._build_httpx_session(verify_ssl, pool_maxsize,
+                                                     http2, unix_socket)
+        else:
+            self.session = self._build_session(verify_ssl, pool_connections,
+                                               pool_maxsize, persistent_cache)
+        self._init_state(username, cache_ttl, cache_size)
+
+        # A shared session's pool is already warm (and a per-request client
+        # must not pay an extra round trip on every construction)
+        if api_key:
+            self.headers['X-API-Key'] = api_key
+            if self._owns_session:
+                self.warm_up()
+        elif username and password and self._load_cached_token() and self._owns_session:
+            self.warm_up()
+
+    @staticmethod
+    def _build_session(verify_ssl: bool, pool_connections: int, pool_maxsize: int,
+                       cache_path: str = None) -> requests.Session:
+        """Create a pooled keep-alive requests session."""
+        if cache_path:
+            if requests_cache is None:
+                raise ImportError("persistent_cache requires requests-cache: "
+                                  "pip install requests-cache")
+            # Only the rarely-changing endpoints are stored; once expired
+            # they are revalidated with If-None-Match/If-Modified-Since
+            session = requests_cache.CachedSession(
+                os.path.expanduser(cache_path),
+                backend='sqlite',
+                expire_after=requests_cache.DO_NOT_CACHE,
+                urls_expire_after={f'*{path}': _PERSISTENT_CACHE_TTL
+                                   for path in _PERSISTENT_CACHE_PATHS},
+                allowable_methods=('GET',),
+                cache_control=True,
+                stale_if_error=True
+            )
+        else:
+            session = requests.Session()
+        session.verify = verify_ssl
+        # Accept-Encoding keeps requests' default, which lists br and zstd
+        # only when urllib3 has a decoder installed for them
+        session.headers.update({'Connection': 'keep-alive',
+                                'User-Agent': _USER_AGENT})
+        # POST is left out of the retried methods: creates are not idempotent
+        adapter = _KeepAliveAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=3, backoff_factor=0.2,
+                              status_forcelist=(502, 503, 504),
+                              allowed_methods=frozenset(['GET', 'HEAD', 'PUT', 'DELETE']),
+                              raise_on_status=False)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @staticmethod
+    def _build_httpx_session(verify_ssl: bool, pool_maxsize: int, http2: bool,
+                             uds: Optional[str]) -> 'httpx.Client':
+        """Create an httpx client for HTTP/2 or Unix socket transports."""
+        if httpx is None:
+            raise ImportError("http2/unix_socket require httpx: "
+                              "pip install 'httpx[http2]'")
+
+        limits = httpx.Limits(max_connections=pool_maxsize,
+                              max_keepalive_connections=pool_maxsize,
+                              keepalive_expiry=60.0)
+        transport = httpx.HTTPTransport(
+            http2=http2, verify=verify_ssl, limits=limits, retries=3, uds=uds,
+            socket_options=None if uds else _KEEPALIVE_SOCKET_OPTIONS)
+        return httpx.Client(transport=transport, timeout=30,
+                            headers={'User-Agent': _USER_AGENT})
+
+    def _ensure_login(self) -> None:
+        """Log in, or renew an expiring token, before an authenticated call."""
+        with self._auth_lock:
+            if not self._login_due():
+                return  # another thread got here first
+            if self.token is None:
+                self.login(self.username, self._password, self._realm)
+            else:
+                self._refresh_login()
+
+    # Flows (see _flow) run inline here: each call they yield has already
+    # completed, so its result is simply handed back
+
+    @staticmethod
+    def _run(flow: Generator) -> Any:
+        """Run a flow to completion and return its result."""
+        result = None
+        try:
+            while True:
+                result = flow.send(result)
+        except StopIteration as done:
+            return done.value
+
+    _sleep = staticmethod(time.sleep)
+
+    @staticmethod
+    def _in_background(flow: Callable, *args) -> None:
+        """Run a flow on a daemon thread."""
+        threading.Thread(target=flow, args=args, daemon=True).start()
+
+    def batch(self, max_workers: int = 8) -> Batch:
+        """
+        Queue several independent calls and send them together.
+
+        Example:
+            with client.batch() as batch:
+                ssh = batch.add_firewall_rule("allow-ssh", "Accept", "Tcp", port=22)
+                http = batch.add_firewall_rule("allow-http", "Accept", "Tcp", port=80)
+            print(ssh.result()['id'], http.result()['id'])
+
+        Args:
+            max_workers: Maximum number of calls in flight at once
+
+        Returns:
+            Batch whose methods mirror the client's
+        """
+        return Batch(self, max_workers=max_workers)
+
+    def bulk(self, items: List[Any], fn: Callable[[Any], Any],
+             max_workers: int = 16) -> List[Any]:
+        """
+        Apply fn to every item concurrently over the pooled session.
+
+        The calls share the client's connection pool, so keep max_workers at
+        or below pool_maxsize. Don't call login() or logout() while a bulk
+        operation is running; the token is shared by all workers.
+
+        Example:
+            stats = client.bulk(vm_ids, client.get_vm_stats)
+
+        Args:
+            items: Arguments to call fn with, one call per item
+            fn: Callable taking a single item (usually a client method)
+            max_workers: Maximum number of calls in flight at once
+
+        Returns:
+            Results in the same order as items
+
+        Raises:
+            HorcruxError: The first error raised by a call
+        """
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+    def stream_get(self, path: str, params: Dict = None,
+                   record_path: str = 'item') -> Iterator[Any]:
+        """
+        GET a JSON document and yield the records under record_path.
+
+        With ijson installed, records are parsed incrementally as the body
+        arrives, so peak memory is bounded by one record rather than the
+        whole response. Without it the body is decoded in one go.
+
+        Args:
+            path: API path
+            params: Query parameters
+            record_path: ijson prefix of the records, e.g. "item" for a
+                top-level array or "data.item" for {"data": [...]}
+        """
+        try:
+            with self._open_stream(path, params=params) as response:
+                if ijson is None:
+                    if httpx is not None and isinstance(response, httpx.Response):
+                        response.read()
+                    yield from _select_records(self._handle_response(response),
+                                               record_path)
+                    return
+
+                if httpx is not None and isinstance(response, httpx.Response):
+                    chunks = response.iter_bytes(_STREAM_CHUNK_SIZE)
+                else:
+                    chunks = response.iter_content(_STREAM_CHUNK_SIZE)
+
+                records = ijson.sendable_list()
+                parser = ijson.items_coro(records, record_path, use_float=True)
+                for chunk in chunks:
+                    parser.send(chunk)
+                    yield from records
+                    del records[:]
+                parser.close()
+                yield from records
+
+        except _TRANSPORT_ERRORS as e:
+            raise HorcruxError(f"Request failed: {str(e)}")
+
+    def _watch_events(self, path: str, timeout: float,
+                      on_event: Callable[[str, Dict], Any]) -> Any:
+        """Feed a Server-Sent Events stream to on_event until it returns a result."""
+        for event, data in self._stream_events(path, timeout):
+            result = on_event(event, data)
+            if result is not None:
+                return result
+        return None
+
+    def _stream_events(self, path: str, timeout: float) -> Iterator[Tuple[str, Dict]]:
+        """Yield (event, data) pairs from a Server-Sent Events endpoint."""
+        try:
+            with self._open_stream(path, headers={'Accept': 'text/event-stream'},
+                                   timeout=timeout) as response:
+                parser = _EventStreamParser()
+                for line in response.iter_lines():
+                    if isinstance(line, bytes):
+                        line = line.decode('utf-8')
+
+                    event = parser.feed(line)
+                    if event is not None:
+                        yield event
+
+        except _TRANSPORT_ERRORS as e:
+            raise HorcruxError(f"Request failed: {str(e)}")
+
+    @contextmanager
+    def _open_stream(self, path: str, params: Dict = None, headers: Dict = None,
+                     timeout: float = 30) -> Iterator[Any]:
+        """Open a streamed GET, raising HorcruxError for error statuses."""
+        if self._login_due():
+            self._ensure_login()
+        url = f"{self.base_url}{path}"
+        headers = {**self.headers, **(headers or {})}
+        if httpx is not None and isinstance(self.session, httpx.Client):
+            stream = self.session.stream('GET', url, params=params,
+                                         headers=headers, timeout=timeout)
+        else:
+            stream = self.session.get(url, params=params, headers=headers,
+                                      stream=True, timeout=timeout)
+
+        with stream as response:
+            if response.status_code >= 400:
+                if httpx is not None and isinstance(response, httpx.Response):
+                    response.read()
+                self._handle_response(response)
+            yield response
+
+    def _send(self, method: str, path: str, data: Dict = None,
+              params: Dict = None, timeout: float = 30,
+              headers: Dict = None) -> Any:
+        """Send an HTTP request and return the raw response."""
+        if path != '/api/auth/login' and self._login_due():
+            self._ensure_login()
+        url = f"{self.base_url}{path}"
+        body, headers = _encode_json(data, headers)
+        headers = {**self.headers, **(headers or {})}
+
+        try:
+            if httpx is not None and isinstance(self.session, httpx.Client):
+                return self.session.request(method, url, content=body, params=params,
+                                            headers=headers, timeout=timeout)
+            return self.session.request(
+                method=method,
+                url=url,
+                data=body,
+                params=params,
+                headers=headers,
+                timeout=timeout
+            )
+        except _TRANSPORT_ERRORS as e:
+            raise HorcruxError(f"Request failed: {str(e)}")
+
+    def _probe(self, path: str, timeout: float) -> Any:
+        """Send a single HEAD request, without the adapter's retries."""
+        if httpx is not None and isinstance(self.session, httpx.Client):
+            return self._send('HEAD', path, timeout=timeout)
+
+        # Go straight to the adapter's connection pool, so the connection
+        # stays pooled but an unreachable server fails once instead of
+        # after every retry and backoff
+        url = f"{self.base_url}{path}"
+        request = self.session.prepare_request(
+            requests.Request('HEAD', url, headers=self.headers))
+        settings = self.session.merge_environment_settings(url, {}, None, None, None)
+        adapter = self.session.get_adapter(url)
+        try:
+            if hasattr(adapter, 'get_connection_with_tls_context'):
+                conn = adapter.get_connection_with_tls_context(
+                    request, settings['verify'], settings['proxies'], settings['cert'])
+            else:  # requests < 2.32.2
+                conn = adapter.get_connection(url, settings['proxies'])
+            return conn.urlopen('HEAD', adapter.request_url(request, settings['proxies']),
+                                headers=request.headers, retries=False, redirect=False,
+                                assert_same_host=False, timeout=timeout)
+        except (Urllib3Error, OSError) + _TRANSPORT_ERRORS as e:
+            raise HorcruxError(f"Request failed: {str(e)}")
+
     def __enter__(self):
         """Context manager entry."""
         return self
 
+    def close(self) -> None:
+        """Close all pooled connections held by the client."""
+        if self._owns_session:
+            self.session.close()
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit."""
-        self.logout()
+        """Context manager exit; keeps a persisted token valid for reuse."""
+        try:
+            if not self._token_cache:
+                self.logout()
+        finally:
+            self.close()
+
+
+class _BufferedResponse:
+    """A fully read response exposing the parts _handle_response() uses."""
+
+    def __init__(self, status_code: int, headers: Any, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+
+class AsyncHorcruxClient(_HorcruxClientBase):
+    """
+    asyncio client for the Horcrux API built on aiohttp (or httpx for HTTP/2).
+
+    Every public method of HorcruxClient except batch() is available and
+    returns an awaitable, so independent calls can be overlapped with
+    asyncio.gather() (or bulk()) over one keep-alive connection pool. Use it
+    as an async context manager, which logs in on entry and logs out and
+    closes the pool on exit:
+
+        async with AsyncHorcruxClient(url, "admin", "admin") as client:
+            vms = await client.list_vms()
+            stats = await client.get_vm_stats_bulk([vm['id'] for vm in vms])
+    """
+
+    def __init__(self, base_url: str, username: str = None, password: str = None,
+                 api_key: str = None, verify_ssl: bool = True,
+                 pool_maxsize: int = 32, cache_ttl: float = 5.0,
+                 cache_size: int = 256, http2: bool = False):
+        """
+        Initialize the async client. No connection is made until first use.
+
+        Args:
+            base_url: Base URL of the Horcrux API (e.g., "http://localhost:8006")
+            username: Username for authentication (if using password auth)
+            password: Password for authentication (if using password auth)
+            api_key: API key for authentication (alternative to username/password)
+            verify_ssl: Whether to verify SSL certificates
+            pool_maxsize: Maximum number of concurrent connections, which also
+                caps the number of requests in flight
+            cache_ttl: Seconds to cache read-mostly listings (0 disables)
+            cache_size: Maximum number of cached responses
+            http2: Use an httpx HTTP/2 transport (requires ``httpx[http2]``)
+                instead of aiohttp, so concurrent calls multiplex over a
+                single connection
+        """
+        if http2 and httpx is None:
+            raise ImportError("http2=True requires httpx: pip install 'httpx[http2]'")
+        if not http2 and aiohttp is None:
+            raise ImportError("AsyncHorcruxClient requires aiohttp: pip install aiohttp")
+
+        self.base_url = base_url.rstrip('/')
+        self.session = None
+        self.headers = {'User-Agent': _USER_AGENT}
+        self._verify_ssl = verify_ssl
+        self._pool_maxsize = pool_maxsize
+        self._http2 = http2
+        self._password = None if api_key else password
+        self._refresh_tasks = set()
+        self._init_state(username, cache_ttl, cache_size)
+        self._auth_lock = asyncio.Lock()
+
+        if api_key:
+            self.headers['X-API-Key'] = api_key
+
+    async def _ensure_login(self) -> None:
+        """Log in, or renew an expiring token, before an authenticated call."""
+        async with self._auth_lock:
+            if not self._login_due():
+                return  # another task got here first
+            if self.token is None:
+                await self.login(self.username, self._password, self._realm)
+            else:
+                await self._refresh_login()
+
+    @staticmethod
+    async def _run(flow: Generator) -> Any:
+        """Run a flow (see _flow), awaiting each call it yields."""
+        result, error = None, None
+        try:
+            while True:
+                step = flow.throw(error) if error is not None else flow.send(result)
+                try:
+                    result, error = await step, None
+                except Exception as e:
+                    result, error = None, e
+        except StopIteration as done:
+            return done.value
+
+    _sleep = staticmethod(asyncio.sleep)
+
+    def _in_background(self, flow: Callable, *args) -> None:
+        """Run a flow as a task that close() cancels."""
+        task = asyncio.get_running_loop().create_task(flow(*args))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def bulk(self, items: List[Any], fn: Callable[[Any], Any],
+                   max_workers: int = 16) -> List[Any]:
+        """Await fn(item) for every item, at most max_workers at a time."""
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def call(item):
+            async with semaphore:
+                return await fn(item)
+
+        return list(await asyncio.gather(*(call(item) for item in items)))
+
+    async def stream_get(self, path: str, params: Dict = None,
+                         record_path: str = 'item'):
+        """GET a JSON document and asynchronously yield the records under record_path."""
+        try:
+            async with self._open_stream(path, params=params) as chunks:
+                if ijson is None:
+                    body = b''.join([chunk async for chunk in chunks])
+                    document = _json_loads(body) if body else {}
+                    for record in _select_records(document, record_path):
+                        yield record
+                    return
+
+                records = ijson.sendable_list()
+                parser = ijson.items_coro(records, record_path, use_float=True)
+                async for chunk in chunks:
+                    parser.send(chunk)
+                    for record in records:
+                        yield record
+                    del records[:]
+                parser.close()
+                for record in records:
+                    yield record
+
+        except _ASYNC_TRANSPORT_ERRORS as e:
+            raise HorcruxError(f"Request failed: {str(e)}")
+
+    async def _watch_events(self, path: str, timeout: float,
+                            on_event: Callable[[str, Dict], Any]) -> Any:
+        """Feed a Server-Sent Events stream to on_event until it returns a result."""
+        async for event, data in self._stream_events(path, timeout):
+            result = on_event(event, data)
+            if result is not None:
+                return result
+        return None
+
+    async def _stream_events(self, path: str, timeout: float):
+        """Yield (event, data) pairs from a Server-Sent Events endpoint."""
+        try:
+            async with self._open_stream(path, headers={'Accept': 'text/event-stream'},
+                                         timeout=timeout) as chunks:
+                parser = _EventStreamParser()
+                async for line in _aiter_lines(chunks):
+                    event = parser.feed(line)
+                    if event is not None:
+                        yield event
+
+        except _ASYNC_TRANSPORT_ERRORS as e:
+            raise HorcruxError(f"Request failed: {str(e)}")
+
+    def _get_session(self) -> Any:
+        """Create the pooled session on first use, inside the running loop."""
+        if self.session is None and self._http2:
+            limits = httpx.Limits(max_connections=self._pool_maxsize,
+                                  max_keepalive_connections=self._pool_maxsize,
+                                  keepalive_expiry=60.0)
+            transport = httpx.AsyncHTTPTransport(http2=True, verify=self._verify_ssl,
+                                                 limits=limits, retries=3,
+                                                 socket_options=_KEEPALIVE_SOCKET_OPTIONS)
+            self.session = httpx.AsyncClient(transport=transport, timeout=30)
+        elif self.session is None:
+            # aiohttp already sets TCP_NODELAY on its connections
+            connector = aiohttp.TCPConnector(limit=self._pool_maxsize,
+                                             limit_per_host=self._pool_maxsize,
+                                             keepalive_timeout=60,
+                                             ssl=None if self._verify_ssl else False)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    @asynccontextmanager
+    async def _open_stream(self, path: str, params: Dict = None,
+                           headers: Dict = None, timeout: float = 30):
+        """Open a streamed GET and yield its body as an async iterator of chunks."""
+        if self._login_due():
+            await self._ensure_login()
+        session = self._get_session()
+        url = f"{self.base_url}{path}"
+        params = self._query_params(params)
+        headers = {**self.headers, **(headers or {})}
+
+        if self._http2:
+            async with session.stream('GET', url, params=params, headers=headers,
+                                      timeout=timeout) as response:
+                if response.status_code >= 400:
+                    self._handle_response(_BufferedResponse(
+                        response.status_code, response.headers, await response.aread()))
+                yield response.aiter_bytes(_STREAM_CHUNK_SIZE)
+        else:
+            async with session.get(url, params=params, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status >= 400:
+                    self._handle_response(_BufferedResponse(
+                        response.status, response.headers, await response.read()))
+                yield response.content.iter_chunked(_STREAM_CHUNK_SIZE)
+
+    @staticmethod
+    def _query_params(params: Optional[Dict]) -> Optional[Dict]:
+        """aiohttp rejects bool and None values; encode them the way requests does."""
+        if not params:
+            return params
+        return {k: str(v) for k, v in params.items() if v is not None}
+
+    async def _probe(self, path: str, timeout: float) -> _BufferedResponse:
+        """Send a single HEAD request."""
+        return await self._send('HEAD', path, timeout=timeout)
+
+    async def _send(self, method: str, path: str, data: Dict = None,
+                    params: Dict = None, timeout: float = 30,
+                    headers: Dict = None) -> _BufferedResponse:
+        """Send an HTTP request and return the fully read response."""
+        if path != '/api/auth/login' and self._login_due():
+            await self._ensure_login()
+        session = self._get_session()
+        params = self._query_params(params)
+        body, headers = _encode_json(data, headers)
+
+        url = f"{self.base_url}{path}"
+        headers = {**self.headers, **(headers or {})}
+
+        try:
+            if self._http2:
+                response = await session.request(method, url, content=body, params=params,
+                                                 headers=headers, timeout=timeout)
+                return _BufferedResponse(response.status_code, response.headers,
+                                         response.content)
+
+            async with session.request(method, url, data=body, params=params,
+                                       headers=headers,
+                                       timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                return _BufferedResponse(response.status, response.headers,
+                                         await response.read())
+        except _ASYNC_TRANSPORT_ERRORS as e:
+            raise HorcruxError(f"Request failed: {str(e)}")
+
+    async def close(self) -> None:
+        """Close all pooled connections held by the client."""
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        if self._http2 and self.session is not None:
+            await self.session.aclose()
+        elif self.session is not None:
+            await self.session.close()
+        self.session = None
+
+    async def __aenter__(self):
+        """Log in (or reuse a persisted token) on entry."""
+        if (self.username and self._password and not self.token
+                and not self._load_cached_token()):
+            await self._ensure_login()
+        elif self.token or 'X-API-Key' in self.headers:
+            await self.warm_up()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Log out (unless the token is persisted) and close the pool."""
+        try:
+            if not self._token_cache:
+                await self.logout()
+        finally:
+            await self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client(**kwargs) -> HorcruxClient:
+    """
+    Get the process-wide shared client, creating it on first use.
+
+    The first call builds the client from kwargs, with base_url, username,
+    password and api_key defaulting to the HORCRUX_URL, HORCRUX_USERNAME,
+    HORCRUX_PASSWORD and HORCRUX_API_KEY environment variables. Later calls
+    return the same authenticated client and ignore kwargs. The client is
+    logged out and closed at interpreter exit.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            kwargs.setdefault('base_url', os.environ.get('HORCRUX_URL', 'http://localhost:8006'))
+            kwargs.setdefault('username', os.environ.get('HORCRUX_USERNAME'))
+            kwargs.setdefault('password', os.environ.get('HORCRUX_PASSWORD'))
+            kwargs.setdefault('api_key', os.environ.get('HORCRUX_API_KEY'))
+            _default_client = HorcruxClient(**kwargs)
+            atexit.register(_close_default_client)
+        return _default_client
+
+
+def _close_default_client() -> None:
+    """Release the shared client at interpreter exit."""
+    try:
+        _default_client.__exit__(None, None, None)
+    except HorcruxError:
+        pass
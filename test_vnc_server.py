@@ -15,13 +15,78 @@ RFB Protocol Flow:
 6. Client sends ClientInit
 7. Server sends ServerInit (framebuffer parameters)
 8. Normal operation (client/server messages)
+
+All clients are served from a single thread: each connection is a small
+state machine advanced by readiness events from a selectors event loop.
+With --io-uring (Linux, requires the liburing package) the same state
+machine is driven by io_uring completions instead.
 """
 
+import logging
+import selectors
 import socket
 import struct
 import sys
 import time
-import threading
+
+try:
+    import liburing
+except ImportError:
+    liburing = None  # --io-uring is unavailable
+
+# Precompiled formats for parsing client message lengths
+_U16 = struct.Struct('!H')
+_U32 = struct.Struct('!I')
+
+# Reply to every FramebufferUpdateRequest: message type 0, no rectangles
+_EMPTY_FB_UPDATE = struct.pack('!BxH', 0, 0)
+
+_BANNER = "=" * 70
+
+# Connection events are logged at INFO, every handshake step and client
+# message at DEBUG (enabled with --verbose)
+log = logging.getLogger('mockvnc')
+
+# Second and formatted text of the last log timestamp: log lines within the
+# same second reuse it instead of calling strftime again
+_timestamp_cache = [None, '']
+
+def _timestamp(created):
+    """Local time of the epoch timestamp created as HH:MM:SS for log lines"""
+    second = int(created)
+    if second != _timestamp_cache[0]:
+        _timestamp_cache[0] = second
+        _timestamp_cache[1] = time.strftime('%H:%M:%S', time.localtime(second))
+    return _timestamp_cache[1]
+
+class _LogFormatter(logging.Formatter):
+    """Formats log records as '[HH:MM:SS] message' using the cached timestamp"""
+
+    def __init__(self):
+        super().__init__('[%(asctime)s] %(message)s')
+
+    def formatTime(self, record, datefmt=None):
+        return _timestamp(record.created)
+
+class ClientState:
+    """Progress of one client connection through the RFB handshake"""
+
+    # One of these lives for every open connection: no per-instance dict
+    __slots__ = ('sock', 'address', 'state', 'buf', 'received', 'recv_buf',
+                 'recv_view', 'inbox', 'pending', 'waiting_to_write')
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.state = 'version'  # what the server expects to read next
+        self.buf = bytearray(12)  # handshake field being read
+        self.received = 0
+        # Reused for every read once the handshake is done
+        self.recv_buf = bytearray(4096)
+        self.recv_view = memoryview(self.recv_buf)
+        self.inbox = bytearray()  # client messages not yet handled
+        self.pending = bytearray()  # output the socket has not accepted yet
+        self.waiting_to_write = False
 
 class MockVNCServer:
     """Simulates a VNC server for testing purposes"""
@@ -29,11 +94,67 @@ class MockVNCServer:
     RFB_VERSION = b"RFB 003.008\n"
     SECURITY_NONE = 1
 
+    # Fixed handshake replies. Every server message in the handshake
+    # answers a client message, so they cannot be merged into one send.
+    SECURITY_TYPES = struct.pack('BB', 1, SECURITY_NONE)  # 1 type, type=None
+    SECURITY_RESULT_OK = struct.pack('!I', 0)  # 0 = OK
+
+    # Framebuffer parameters advertised in ServerInit
+    WIDTH = 1024
+    HEIGHT = 768
+    DESKTOP_NAME = b"Horcrux Test VM"
+
+    # Pixel format (16 bytes, multi-byte fields big-endian like the rest of RFB):
+    # bits_per_pixel(1) depth(1) big_endian(1) true_color(1)
+    # red_max(2) green_max(2) blue_max(2)
+    # red_shift(1) green_shift(1) blue_shift(1)
+    # padding(3)
+    PIXEL_FORMAT = struct.pack(
+        '!BBBB HHH BBB xxx',
+        32,  # bits per pixel
+        24,  # depth
+        0,   # big endian (0 = little endian)
+        1,   # true color
+        255, # red max
+        255, # green max
+        255, # blue max
+        16,  # red shift
+        8,   # green shift
+        0,   # blue shift
+    )
+
+    # ServerInit is the same for every client, so it is built once
+    # Format: width(2) height(2) pixel_format(16) name_length(4) name(variable)
+    SERVER_INIT = struct.pack('!HH', WIDTH, HEIGHT) + PIXEL_FORMAT + \
+                  struct.pack('!I', len(DESKTOP_NAME)) + DESKTOP_NAME
+
+    # Bytes the client sends in each handshake state
+    HANDSHAKE_SIZES = {'version': 12, 'security': 1, 'client_init': 1}
+
+    # Sizes of the fixed-length client messages, by message type
+    MESSAGE_SIZES = {0: 20, 3: 10, 4: 8, 5: 6}
+
+    # Send/receive buffer size for client sockets
+    SOCKET_BUFFER_SIZE = 65536
+
     def __init__(self, host='127.0.0.1', port=5900):
         self.host = host
         self.port = port
         self.running = False
-        self.clients = []
+        self.selector = None
+        # stop() writes to this pair to wake the event loop from any thread
+        self.wakeup_reader = None
+        self.wakeup_writer = None
+        # Client message handlers, indexed by message type (None = unknown)
+        self.handlers = (
+            self.set_pixel_format,            # 0
+            None,                             # 1
+            self.set_encodings,               # 2
+            self.framebuffer_update_request,  # 3
+            self.key_event,                   # 4
+            self.pointer_event,               # 5
+            self.client_cut_text,             # 6
+        )
 
     def start(self):
         """Start the mock VNC server"""
@@ -42,7 +163,13 @@ class MockVNCServer:
 
         try:
             self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
+            self.server_socket.listen(socket.SOMAXCONN)
+            self.server_socket.setblocking(False)
+
+            self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.server_socket, selectors.EVENT_READ)
+            self.selector.register(self.wakeup_reader, selectors.EVENT_READ)
             self.running = True
 
             print(f"Mock VNC server listening on {self.host}:{self.port}")
@@ -52,159 +179,270 @@ class MockVNCServer:
 
             while self.running:
                 try:
-                    client_socket, client_address = self.server_socket.accept()
-                    print(f"[{time.strftime('%H:%M:%S')}] Client connected: {client_address}")
-
-                    # Handle client in a separate thread
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, client_address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                    self.clients.append((client_socket, client_thread))
-
+                    events = self.selector.select()
                 except KeyboardInterrupt:
                     break
-                except Exception as e:
-                    print(f"Error accepting connection: {e}")
+
+                for key, mask in events:
+                    if key.fileobj is self.server_socket:
+                        self.accept_client()
+                    elif key.fileobj is self.wakeup_reader:
+                        self.wakeup_reader.recv(1)  # stop() was called
+                    else:
+                        self.service_client(key.data, mask)
 
         finally:
-            self.stop()
+            self.close()
+
+    def accept_client(self):
+        """Accept every pending connection and start its handshake"""
+        # One readiness event can stand for a burst of connections: drain the
+        # backlog rather than going back to select() for each of them
+        while True:
+            try:
+                client_socket, client_address = self.server_socket.accept()
+            except BlockingIOError:
+                return
+            except Exception as e:
+                log.error("Error accepting connection: %s", e)
+                return
+
+            client_socket.setblocking(False)
+            client = ClientState(client_socket, client_address)
+            self.selector.register(client_socket, selectors.EVENT_READ, client)
+            self.client_connected(client)
+
+    def client_connected(self, client):
+        """Start the handshake with a newly accepted client"""
+        log.info("Client connected: %s", client.address)
 
-    def handle_client(self, client_socket, client_address):
-        """Handle a single VNC client connection"""
         try:
+            # The handshake is a series of small request/reply messages, so it
+            # is latency-bound: disable Nagle so replies are not held back ~40 ms
+            client.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.SOCKET_BUFFER_SIZE)
+            client.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.SOCKET_BUFFER_SIZE)
+
             # Step 1: Send RFB version
-            client_socket.sendall(self.RFB_VERSION)
-            print(f"[{time.strftime('%H:%M:%S')}] -> Sent RFB version to {client_address}")
+            self.send(client, self.RFB_VERSION)
+            log.debug("-> Sent RFB version to %s", client.address)
+        except OSError as e:
+            # e.g. the client reset the connection right after connecting
+            log.error("Error handling client %s: %s", client.address, e)
+            self.close_client(client)
+
+    def service_client(self, client, mask):
+        """Handle a readiness event for one client connection"""
+        try:
+            if mask & selectors.EVENT_WRITE:
+                self.flush(client)
+            if mask & selectors.EVENT_READ:
+                if client.state == 'messages':
+                    self.handle_message(client)
+                else:
+                    self.handle_handshake(client)
+        except Exception as e:
+            log.error("Error handling client %s: %s", client.address, e)
+            self.close_client(client)
 
+    def handle_handshake(self, client):
+        """Read the next handshake field and send the reply it unlocks"""
+        needed = self.HANDSHAKE_SIZES[client.state]
+        try:
+            count = client.sock.recv_into(memoryview(client.buf)[client.received:needed])
+        except BlockingIOError:
+            return  # spurious wakeup: no data yet
+        self.handshake_received(client, count)
+
+    def handshake_received(self, client, count):
+        """Account for count new bytes in client.buf and advance the handshake"""
+        needed = self.HANDSHAKE_SIZES[client.state]
+        if count == 0:
+            log.info("<- Client closed the connection during the handshake")
+            self.close_client(client)
+            return
+
+        client.received += count
+        if client.received < needed:
+            return
+        client.received = 0
+
+        if client.state == 'version':
             # Step 2: Receive client version
-            client_version = client_socket.recv(12)
-            if len(client_version) == 12:
-                print(f"[{time.strftime('%H:%M:%S')}] <- Received client version: {client_version.decode().strip()}")
-            else:
-                print(f"[{time.strftime('%H:%M:%S')}] <- Invalid client version length: {len(client_version)}")
-                return
+            log.debug("<- Received client version: %s", client.buf.decode().strip())
 
             # Step 3: Send security types (1 type: None)
-            security_types = struct.pack('BB', 1, self.SECURITY_NONE)  # 1 type, type=None
-            client_socket.sendall(security_types)
-            print(f"[{time.strftime('%H:%M:%S')}] -> Sent security types: [None]")
+            self.send(client, self.SECURITY_TYPES)
+            log.debug("-> Sent security types: [None]")
+            client.state = 'security'
 
+        elif client.state == 'security':
             # Step 4: Receive client security selection
-            security_selection = client_socket.recv(1)
-            if len(security_selection) == 1:
-                selected = struct.unpack('B', security_selection)[0]
-                print(f"[{time.strftime('%H:%M:%S')}] <- Client selected security type: {selected}")
-            else:
-                print(f"[{time.strftime('%H:%M:%S')}] <- Invalid security selection")
-                return
+            log.debug("<- Client selected security type: %d", client.buf[0])
 
             # Step 5: Send security result (0 = OK)
-            security_result = struct.pack('!I', 0)  # 0 = OK
-            client_socket.sendall(security_result)
-            print(f"[{time.strftime('%H:%M:%S')}] -> Sent security result: OK")
+            self.send(client, self.SECURITY_RESULT_OK)
+            log.debug("-> Sent security result: OK")
+            client.state = 'client_init'
 
+        else:
             # Step 6: Receive ClientInit
-            client_init = client_socket.recv(1)
-            if len(client_init) == 1:
-                shared_flag = struct.unpack('B', client_init)[0]
-                print(f"[{time.strftime('%H:%M:%S')}] <- Received ClientInit (shared={shared_flag})")
-            else:
-                print(f"[{time.strftime('%H:%M:%S')}] <- Invalid ClientInit")
-                return
+            log.debug("<- Received ClientInit (shared=%d)", client.buf[0])
 
             # Step 7: Send ServerInit (framebuffer parameters)
-            # Format: width(2) height(2) pixel_format(16) name_length(4) name(variable)
-            width = 1024
-            height = 768
-
-            # Pixel format (16 bytes):
-            # bits_per_pixel(1) depth(1) big_endian(1) true_color(1)
-            # red_max(2) green_max(2) blue_max(2)
-            # red_shift(1) green_shift(1) blue_shift(1)
-            # padding(3)
-            pixel_format = struct.pack(
-                'BBBB HHH BBB xxx',
-                32,  # bits per pixel
-                24,  # depth
-                0,   # big endian (0 = little endian)
-                1,   # true color
-                255, # red max
-                255, # green max
-                255, # blue max
-                16,  # red shift
-                8,   # green shift
-                0,   # blue shift
-            )
-
-            desktop_name = b"Horcrux Test VM"
-            server_init = struct.pack('!HH', width, height) + pixel_format + \
-                         struct.pack('!I', len(desktop_name)) + desktop_name
-
-            client_socket.sendall(server_init)
-            print(f"[{time.strftime('%H:%M:%S')}] -> Sent ServerInit ({width}x{height}, '{desktop_name.decode()}')")
-            print(f"[{time.strftime('%H:%M:%S')}] VNC handshake complete! Ready for client messages.")
+            self.send(client, self.SERVER_INIT)
+            log.debug("-> Sent ServerInit (%dx%d, '%s')", self.WIDTH, self.HEIGHT, self.DESKTOP_NAME.decode())
+            log.info("VNC handshake complete! Ready for client messages.")
 
             # Step 8: Keep connection alive and log any messages
-            print(f"[{time.strftime('%H:%M:%S')}] Waiting for client messages (Ctrl+C to stop)...")
-
-            while True:
-                # Set timeout to allow checking for shutdown
-                client_socket.settimeout(1.0)
-                try:
-                    data = client_socket.recv(1024)
-                    if not data:
-                        print(f"[{time.strftime('%H:%M:%S')}] Client disconnected")
-                        break
-
-                    # Log received message type
-                    if len(data) > 0:
-                        msg_type = data[0]
-                        print(f"[{time.strftime('%H:%M:%S')}] <- Received message type: {msg_type} ({len(data)} bytes)")
-
-                        # Simple responses for common message types
-                        if msg_type == 0:  # SetPixelFormat
-                            print(f"[{time.strftime('%H:%M:%S')}]    SetPixelFormat message")
-                        elif msg_type == 2:  # SetEncodings
-                            print(f"[{time.strftime('%H:%M:%S')}]    SetEncodings message")
-                        elif msg_type == 3:  # FramebufferUpdateRequest
-                            print(f"[{time.strftime('%H:%M:%S')}]    FramebufferUpdateRequest message")
-                            # Send empty framebuffer update
-                            fb_update = struct.pack('!BxH', 0, 0)  # Type 0, 0 rectangles
-                            client_socket.sendall(fb_update)
-                            print(f"[{time.strftime('%H:%M:%S')}] -> Sent empty FramebufferUpdate")
-                        elif msg_type == 4:  # KeyEvent
-                            print(f"[{time.strftime('%H:%M:%S')}]    KeyEvent message")
-                        elif msg_type == 5:  # PointerEvent
-                            print(f"[{time.strftime('%H:%M:%S')}]    PointerEvent message")
-                        elif msg_type == 6:  # ClientCutText
-                            print(f"[{time.strftime('%H:%M:%S')}]    ClientCutText message")
-
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    print(f"[{time.strftime('%H:%M:%S')}] Error receiving data: {e}")
-                    break
+            log.debug("Waiting for client messages (Ctrl+C to stop)...")
+            client.state = 'messages'
 
-        except Exception as e:
-            print(f"[{time.strftime('%H:%M:%S')}] Error handling client {client_address}: {e}")
-        finally:
-            client_socket.close()
-            print(f"[{time.strftime('%H:%M:%S')}] Connection closed: {client_address}")
-            print()
+    def handle_message(self, client):
+        """Read client messages into the connection's receive buffer"""
+        try:
+            count = client.sock.recv_into(client.recv_view)
+        except BlockingIOError:
+            return  # spurious wakeup: no data yet
+        self.message_received(client, client.recv_view[:count])
+
+    def message_received(self, client, data):
+        """Split received bytes into client messages and handle each one"""
+        if not data:
+            log.info("Client disconnected")
+            self.close_client(client)
+            return
+
+        # Clients pipeline messages (e.g. SetEncodings followed by a
+        # FramebufferUpdateRequest), so one read can hold several of them
+        # or only part of one
+        client.inbox += data
+        updates = 0
+        while client.inbox:
+            length = self.message_length(client.inbox)
+            if length is None or length > len(client.inbox):
+                break
+            updates += self.handle_client_message(client, client.inbox[:length])
+            del client.inbox[:length]
+
+        # Clients poll with FramebufferUpdateRequests in tight loops: answer
+        # all of the ones in this read with a single send
+        if updates:
+            self.send(client, _EMPTY_FB_UPDATE * updates)
+            log.debug("-> Sent %d empty FramebufferUpdate(s)", updates)
+
+    def message_length(self, data):
+        """Length of the client message at the start of data, or None until known"""
+        msg_type = data[0]
+        if msg_type in self.MESSAGE_SIZES:
+            return self.MESSAGE_SIZES[msg_type]
+        if msg_type == 2:  # SetEncodings: header(4) + encoding(4) each
+            return 4 + 4 * _U16.unpack_from(data, 2)[0] if len(data) >= 4 else None
+        if msg_type == 6:  # ClientCutText: header(8) + text
+            return 8 + _U32.unpack_from(data, 4)[0] if len(data) >= 8 else None
+        return len(data)  # unknown type: treat everything received as one message
+
+    def handle_client_message(self, client, data):
+        """Log a client message; returns the number of FramebufferUpdates it requests"""
+        # Log received message type
+        msg_type = data[0]
+        log.debug("<- Received message type: %d (%d bytes)", msg_type, len(data))
+
+        handler = self.handlers[msg_type] if msg_type < len(self.handlers) else None
+        return handler(client, data) if handler else 0
+
+    # Client message handlers: each returns the number of FramebufferUpdates
+    # the message requests
+
+    def set_pixel_format(self, client, data):
+        log.debug("   SetPixelFormat message")
+        return 0
+
+    def set_encodings(self, client, data):
+        log.debug("   SetEncodings message")
+        return 0
+
+    def framebuffer_update_request(self, client, data):
+        log.debug("   FramebufferUpdateRequest message")
+        return 1
+
+    def key_event(self, client, data):
+        log.debug("   KeyEvent message")
+        return 0
+
+    def pointer_event(self, client, data):
+        log.debug("   PointerEvent message")
+        return 0
+
+    def client_cut_text(self, client, data):
+        log.debug("   ClientCutText message")
+        return 0
+
+    def send(self, client, data):
+        """Write data to a client, queueing whatever the socket does not accept"""
+        if client.pending:
+            # Already waiting for writability: flush() sends it after the backlog
+            client.pending += data
+            return
+
+        # Usual case: write straight from data (e.g. the shared SERVER_INIT)
+        # instead of copying it into the queue first
+        try:
+            sent = client.sock.send(data)
+        except BlockingIOError:
+            sent = 0
+        if sent < len(data):
+            client.pending += memoryview(data)[sent:]
+            self.flush(client)
+
+    def flush(self, client):
+        """Write queued output, waiting for writability if the socket is full"""
+        try:
+            sent = client.sock.send(client.pending)
+        except BlockingIOError:
+            sent = 0
+        del client.pending[:sent]
+
+        waiting = bool(client.pending)
+        if waiting != client.waiting_to_write:
+            client.waiting_to_write = waiting
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if waiting else 0)
+            self.selector.modify(client.sock, events, client)
+
+    def close_client(self, client):
+        """Stop watching a client connection and close it"""
+        self.selector.unregister(client.sock)
+        client.sock.close()
+        log.info("Connection closed: %s", client.address)
 
     def stop(self):
-        """Stop the mock VNC server"""
+        """Ask the mock VNC server to stop; safe to call from any thread"""
         self.running = False
+        # close() may reset the attribute to None on the loop thread meanwhile
+        writer = self.wakeup_writer
+        if writer is not None:
+            try:
+                writer.send(b'\0')
+            except OSError:
+                pass  # already closed by the event loop
 
+    def close(self):
+        """Close all sockets once the event loop has exited"""
         # Close all client connections
-        for client_socket, _ in self.clients:
-            try:
-                client_socket.close()
-            except:
-                pass
+        if self.selector is not None:
+            for key in list(self.selector.get_map().values()):
+                if key.data is not None:
+                    try:
+                        key.fileobj.close()
+                    except:
+                        pass
+            self.selector.close()
+            self.selector = None
+
+        if self.wakeup_reader is not None:
+            self.wakeup_writer.close()
+            self.wakeup_reader.close()
+            self.wakeup_reader = self.wakeup_writer = None
 
         # Close server socket
         if hasattr(self, 'server_socket'):
@@ -212,22 +450,255 @@ class MockVNCServer:
 
         print("\nMock VNC server stopped")
 
+class IoUringVNCServer(MockVNCServer):
+    """
+    MockVNCServer driven by io_uring instead of a selector (requires liburing)
+
+    One multishot accept covers every incoming connection, and each read and
+    write is a ring entry, so a single io_uring_enter call submits and reaps
+    many operations instead of one syscall per operation.
+
+    The liburing bindings keep the GIL while waiting for completions, so
+    other threads cannot run (or call stop()) meanwhile: run this server in
+    its own process, as main() does, and stop it with Ctrl+C.
+    """
+
+    RING_ENTRIES = 1024
+    ACCEPT_OP = 0  # user_data of the multishot accept
+
+    def __init__(self, host='127.0.0.1', port=5900):
+        if liburing is None:
+            raise ImportError("--io-uring requires liburing: pip install liburing")
+        super().__init__(host, port)
+        self.ring = None
+        self.connections = {}  # fd -> ClientState
+        self.operations = {}  # user_data -> (kind, client, buffer kept alive)
+        self.in_flight = {}  # ClientState -> number of its operations not completed
+        self.next_op = 1
+
+    def start(self):
+        """Start the mock VNC server"""
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        try:
+            self.server_socket.bind((self.host, self.port))
+            self.server_socket.listen(socket.SOMAXCONN)
+
+            self.ring = liburing.Ring()
+            try:
+                # Only this thread submits, so completions can be deferred
+                # until it waits for them
+                liburing.io_uring_queue_init(
+                    self.RING_ENTRIES, self.ring,
+                    liburing.IORING_SETUP_SINGLE_ISSUER | liburing.IORING_SETUP_DEFER_TASKRUN)
+            except OSError:
+                # Kernels older than 6.1 lack these setup flags
+                liburing.io_uring_queue_init(self.RING_ENTRIES, self.ring)
+            self.running = True
+
+            print(f"Mock VNC server listening on {self.host}:{self.port} (io_uring)")
+            print(f"RFB Version: {self.RFB_VERSION.decode().strip()}")
+            print("Waiting for connections...")
+            print()
+
+            self.submit_accept()
+            cqe = liburing.Cqe()
+            while self.running:
+                try:
+                    liburing.io_uring_submit_and_wait(self.ring, 1)
+                except KeyboardInterrupt:
+                    break
+
+                for _ in range(liburing.io_uring_cq_ready(self.ring)):
+                    liburing.io_uring_peek_cqe(self.ring, cqe)
+                    entry = cqe[0]
+                    op, flags = entry.user_data, entry.flags
+                    try:
+                        result = entry.res
+                    except OSError as e:
+                        # The bindings raise for a negative (-errno) result
+                        result = -e.errno
+                    liburing.io_uring_cqe_seen(self.ring, entry)
+                    self.complete(op, result, flags)
+
+        finally:
+            self.close()
+
+    def get_sqe(self, kind, client, buffer):
+        """Reserve a submission entry, tagging it so its completion can be routed"""
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        if sqe is None:
+            # Submission queue is full: hand the queued entries to the kernel
+            liburing.io_uring_submit(self.ring)
+            sqe = liburing.io_uring_get_sqe(self.ring)
+
+        if kind == 'accept':
+            op = self.ACCEPT_OP
+        else:
+            op = self.next_op
+            self.next_op += 1
+            # The kernel reads from / writes into buffer until completion
+            self.operations[op] = (kind, client, buffer)
+            self.in_flight[client] = self.in_flight.get(client, 0) + 1
+        liburing.io_uring_sqe_set_data64(sqe, op)
+        return sqe
+
+    def submit_accept(self):
+        sqe = self.get_sqe('accept', None, None)
+        liburing.io_uring_prep_multishot_accept(sqe, self.server_socket.fileno())
+
+    def submit_recv(self, client):
+        if client.state == 'messages':
+            buffer = client.recv_buf
+        else:
+            # Read no further than the end of the current handshake field
+            buffer = bytearray(self.HANDSHAKE_SIZES[client.state] - client.received)
+        sqe = self.get_sqe('recv', client, buffer)
+        liburing.io_uring_prep_recv(sqe, client.sock.fileno(), buffer)
+
+    def send(self, client, data):
+        """Send data to a client, keeping at most one send per socket in flight"""
+        if client.state == 'closed':
+            return
+        if client.waiting_to_write:
+            # Sends on one socket can complete out of order or short, so the
+            # next one is only submitted once the previous one has finished
+            client.pending += data
+            return
+        client.waiting_to_write = True
+        self.submit_send(client, data)
+
+    def submit_send(self, client, data):
+        sqe = self.get_sqe('send', client, data)
+        liburing.io_uring_prep_send(sqe, client.sock.fileno(), data)
+
+    def complete(self, op, result, flags):
+        """Handle one completion queue entry"""
+        if op == self.ACCEPT_OP:
+            if not flags & liburing.IORING_CQE_F_MORE:
+                # The kernel ended the multishot accept; re-arm it
+                self.submit_accept()
+            if result < 0:
+                log.error("Error accepting connection: errno %d", -result)
+                return
+
+            client_socket = socket.socket(fileno=result)
+            try:
+                address = client_socket.getpeername()
+            except OSError as e:
+                # The client reset the connection before it was accepted
+                log.error("Error accepting connection: %s", e)
+                client_socket.close()
+                return
+            client = ClientState(client_socket, address)
+            self.connections[result] = client
+            self.client_connected(client)
+            if client.state != 'closed':
+                self.submit_recv(client)
+            return
+
+        kind, client, buffer = self.operations.pop(op)
+        remaining = self.in_flight.pop(client) - 1
+        if remaining:
+            self.in_flight[client] = remaining
+        if client.state == 'closed':
+            # Completion (often -ECANCELED) for a connection being closed:
+            # the socket can go once the kernel holds no operation on it
+            if not remaining:
+                self.close_socket(client)
+            return
+
+        if result < 0:
+            log.error("Error handling client %s: errno %d", client.address, -result)
+            self.close_client(client)
+        elif kind == 'send':
+            if result < len(buffer):
+                self.submit_send(client, buffer[result:])
+            elif client.pending:
+                data = bytes(client.pending)  # the queue keeps growing meanwhile
+                client.pending.clear()
+                self.submit_send(client, data)
+            else:
+                client.waiting_to_write = False
+        else:
+            if client.state == 'messages':
+                self.message_received(client, client.recv_view[:result])
+            else:
+                client.buf[client.received:client.received + result] = buffer[:result]
+                self.handshake_received(client, result)
+
+            if client.state != 'closed':
+                self.submit_recv(client)
+
+    def close_client(self, client):
+        """Close a client connection once the kernel is done with it"""
+        if client.state == 'closed':
+            return
+        client.state = 'closed'
+        log.info("Connection closed: %s", client.address)
+
+        if client in self.in_flight:
+            # Closing the fd under a pending recv or send would let a new
+            # connection reuse the number while the kernel still targets the
+            # old socket: cancel them first, and close on their completions
+            sqe = self.get_sqe('cancel', client, None)
+            liburing.io_uring_prep_cancel_fd(sqe, client.sock.fileno(),
+                                             liburing.IORING_ASYNC_CANCEL_ALL)
+        else:
+            self.close_socket(client)
+
+    def close_socket(self, client):
+        self.connections.pop(client.sock.fileno(), None)
+        client.sock.close()
+
+    def close(self):
+        """Close all sockets and the ring once the event loop has exited"""
+        for client in list(self.connections.values()):
+            try:
+                client.sock.close()
+            except:
+                pass
+        self.connections.clear()
+        self.in_flight.clear()
+
+        if self.ring is not None:
+            liburing.io_uring_queue_exit(self.ring)
+            self.ring = None
+
+        super().close()
+
 def main():
     """Main entry point"""
-    print("=" * 70)
+    print(_BANNER)
     print("Mock VNC Server for noVNC Testing")
-    print("=" * 70)
+    print(_BANNER)
     print()
 
     # Parse command line arguments
     host = '127.0.0.1'
     port = 5900
 
-    if len(sys.argv) > 1:
-        port = int(sys.argv[1])
+    args = sys.argv[1:]
+    use_io_uring = '--io-uring' in args
+    verbose = '--verbose' in args
+    quiet = '--quiet' in args
+    args = [arg for arg in args if arg not in ('--io-uring', '--verbose', '--quiet')]
+    if args:
+        port = int(args[0])
+
+    # --verbose logs every handshake step and client message, --quiet only
+    # errors (for stress tests); by default connection events are logged
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(_LogFormatter())
+    log.addHandler(handler)
+    log.setLevel(logging.DEBUG if verbose else logging.WARNING if quiet else logging.INFO)
 
     # Create and start server
-    server = MockVNCServer(host=host, port=port)
+    if use_io_uring:
+        server = IoUringVNCServer(host=host, port=port)
+    else:
+        server = MockVNCServer(host=host, port=port)
 
     try:
         server.start()